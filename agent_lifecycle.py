@@ -5,15 +5,18 @@ Functions for starting, stopping, and finding agent worker processes and logs.
 Used by both app.py and test_browser.py.
 """
 
+import functools
 import glob
 import json
 import logging
 import os
+import select
 import signal
 import subprocess
 import sys
 import threading
 import time
+import urllib.request
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -49,28 +52,58 @@ def _in_container():
 
 _AGENT_MODE = "start" if _in_container() else "dev"
 
+# Worker health-check HTTP port. In "start" mode LiveKit binds a fixed port
+# (8081 by default); in "dev" mode it picks a random one, so we can't probe it
+# and _wait_for_worker falls back to a fixed sleep.
+_HEALTH_PORT = int(os.environ.get("AGENT_HEALTH_PORT", "8081"))
+
+# Must match agent_name in agent_worker.py's WorkerOptions — the health
+# server's /worker endpoint reports it, which tells our worker apart from
+# any other service on the port
+_AGENT_NAME = "price-agent"
+
+# Talks to localhost only, so bypass any HTTP(S)_PROXY from the environment
+_local_http = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+# procfs root — scanned by kill_old_agents() (overridable in tests)
+_PROC_DIR = "/proc"
+
+
+def _find_agent_pids() -> list[int]:
+    """Return PIDs of running agent_worker.py processes (excluding ourselves).
+
+    Scans /proc/<pid>/cmdline directly instead of forking pgrep — no
+    subprocess, and works on slim images without procps installed.
+    """
+    if not os.path.isdir(_PROC_DIR):
+        return []
+    my_pid = os.getpid()
+    pids = []
+    with os.scandir(_PROC_DIR) as it:
+        for entry in it:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(os.path.join(entry.path, "cmdline"), "rb") as f:
+                    cmdline = f.read()
+            except (FileNotFoundError, ProcessLookupError, PermissionError):
+                continue  # process exited mid-scan or is not ours to read
+            pid = int(entry.name)
+            if b"agent_worker.py" in cmdline and pid != my_pid:
+                pids.append(pid)
+    return pids
+
 
 def kill_old_agents():
     """Kill any existing agent_worker.py processes."""
-    try:
-        result = subprocess.run(
-            ["pgrep", "-f", "agent_worker.py"],
-            capture_output=True, text=True,
-        )
-    except FileNotFoundError:
-        # pgrep not available (e.g. slim Docker images) — skip cleanup
-        return
-    pids = result.stdout.strip().split("\n")
-    my_pid = str(os.getpid())
+    pids = _find_agent_pids()
     for pid in pids:
-        pid = pid.strip()
-        if pid and pid != my_pid:
-            print(f"  Killing old agent worker (PID {pid})")
-            try:
-                os.kill(int(pid), signal.SIGTERM)
-            except ProcessLookupError:
-                pass
-    if any(p.strip() and p.strip() != my_pid for p in pids):
+        print(f"  Killing old agent worker (PID {pid})")
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    if pids:
         time.sleep(1)
 
 
@@ -95,6 +128,10 @@ def _spawn_worker():
         cwd=str(Path(__file__).parent),
         stdout=sys.stderr,
         stderr=sys.stderr,
+        # Only stdio is inherited, so skip the per-fd close sweep at spawn.
+        close_fds=False,
+        # Own process group, so cleanup_agent() can signal the whole worker tree.
+        start_new_session=True,
     )
     _last_spawn_time = datetime.now(timezone.utc)
     print(f"  Agent worker started (PID {proc.pid}, mode={_AGENT_MODE})")
@@ -102,6 +139,83 @@ def _spawn_worker():
     return proc
 
 
+def _worker_ready(timeout: float) -> bool:
+    """True if the health server on _HEALTH_PORT is our agent worker and healthy.
+
+    "/" answers 200 unless the worker failed to connect to LiveKit; "/worker"
+    returns its WorkerInfo as JSON, whose agent_name must be ours. An open
+    port alone could be any other service.
+    """
+    base = f"http://127.0.0.1:{_HEALTH_PORT}"
+    try:
+        with _local_http.open(f"{base}/", timeout=timeout) as resp:
+            if resp.status != 200:
+                return False
+        with _local_http.open(f"{base}/worker", timeout=timeout) as resp:
+            info = json.loads(resp.read())
+    except (OSError, ValueError):
+        return False  # not listening yet, 503, or not a LiveKit worker
+    return isinstance(info, dict) and info.get("agent_name") == _AGENT_NAME
+
+
+def _wait_for_worker(proc, timeout: float = 3.0, interval: float = 0.05) -> bool:
+    """Wait up to ~timeout seconds for the worker to come up.
+
+    In start mode, polls the worker's health server every `interval` seconds
+    and returns True as soon as it reports our agent and a healthy LiveKit
+    connection (see _worker_ready). Returns False if the process exits or
+    the timeout elapses.
+
+    In dev mode the health port is random, so nothing can be probed: this
+    only sleeps out the timeout (returning False) while watching for an
+    early exit.
+    """
+    for _ in range(int(timeout / interval)):
+        if proc.poll() is not None:
+            return False
+        if _AGENT_MODE == "start" and _worker_ready(interval):
+            return True
+        time.sleep(interval)
+    return False
+
+
+def _signal_worker(sig):
+    """Send `sig` to the worker's process group (falls back to the PID alone)."""
+    try:
+        os.killpg(_agent_proc.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        # Not a group leader (or group already gone) — signal the PID directly
+        _agent_proc.send_signal(sig)
+
+
+def _wait_for_exit(proc, timeout: float) -> bool:
+    """Block until `proc` exits or `timeout` elapses. Returns True if it exited.
+
+    On Linux >= 5.3 this waits on a pidfd, which wakes the moment the child
+    dies; elsewhere it falls back to Popen.wait()'s backoff polling.
+    """
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except OSError:
+            pidfd = None  # older kernel, or the child is already gone
+    if pidfd is None:
+        try:
+            proc.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    try:
+        readable, _, _ = select.select([pidfd], [], [], timeout)
+    finally:
+        os.close(pidfd)
+    if readable:
+        proc.wait()  # reap via Popen so its returncode stays in sync
+        return True
+    return False
+
+
 def _watchdog_loop():
     """Monitor the agent worker and restart it if it dies unexpectedly.
 
@@ -128,14 +242,14 @@ def _watchdog_loop():
             if _watchdog_stop.is_set():
                 break
             _agent_proc = _spawn_worker()
-            time.sleep(3)  # give it time to register with LiveKit
+            _wait_for_worker(_agent_proc)  # give it time to register with LiveKit
 
 
 def start_agent_worker():
     """Start agent worker and a watchdog thread that auto-restarts on crash."""
     global _agent_proc
     _agent_proc = _spawn_worker()
-    time.sleep(3)
+    _wait_for_worker(_agent_proc)
 
     # Start watchdog as daemon thread — dies with main process
     watchdog = threading.Thread(target=_watchdog_loop, daemon=True)
@@ -149,11 +263,9 @@ def cleanup_agent():
     if _agent_proc and _agent_proc.poll() is None:
         print(f"\n  Stopping agent worker (PID {_agent_proc.pid})")
         _log_event("worker_stopping", pid=_agent_proc.pid)
-        _agent_proc.terminate()
-        try:
-            _agent_proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            _agent_proc.kill()
+        _signal_worker(signal.SIGTERM)
+        if not _wait_for_exit(_agent_proc, timeout=5):
+            _signal_worker(signal.SIGKILL)
             _log_event("worker_killed", pid=_agent_proc.pid,
                        reason="graceful shutdown timed out")
 
@@ -190,6 +302,29 @@ def agent_health() -> dict:
     }
 
 
+# Claude Code task output dir (local dev) — agent logs may be captured here
+_TASK_DIR = "/private/tmp/claude-501/-Users-dg-Documents-lab-hyperlocal-discovery/tasks"
+
+
+@functools.lru_cache(maxsize=1)
+def _first_agent_output(entries: tuple) -> str | None:
+    """Return the first (newest) output file that looks like an agent log.
+
+    `entries` is a tuple of (mtime, path), newest first. Only the head of each
+    file is read. Cached on the full listing, so repeat lookups are free until
+    a file is added or touched.
+    """
+    for _, path in entries:
+        try:
+            with open(path, "rb") as f:
+                head = f.read(65536)
+        except OSError:
+            continue
+        if b"price-agent" in head or b"livekit.agents" in head:
+            return path
+    return None
+
+
 def find_agent_log():
     """Find the most recent LiveKit agent log file."""
     patterns = [
@@ -197,16 +332,14 @@ def find_agent_log():
         "/private/tmp/livekit-agents-*.log",
         os.path.expanduser("~/.livekit/agents/*.log"),
     ]
-    task_dir = "/private/tmp/claude-501/-Users-dg-Documents-lab-hyperlocal-discovery/tasks"
-    if os.path.isdir(task_dir):
-        outputs = sorted(Path(task_dir).glob("*.output"), key=lambda p: p.stat().st_mtime, reverse=True)
-        for f in outputs:
-            try:
-                content = f.read_text(errors="replace")
-                if "price-agent" in content or "livekit.agents" in content:
-                    return str(f)
-            except Exception:
-                continue
+    if os.path.isdir(_TASK_DIR):
+        # scandir gets stat info from the directory listing itself
+        with os.scandir(_TASK_DIR) as it:
+            entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".output")]
+        entries.sort(reverse=True)
+        found = _first_agent_output(tuple(entries))
+        if found:
+            return found
     for pat in patterns:
         files = sorted(glob.glob(pat), key=os.path.getmtime, reverse=True)
         if files:
@@ -14,13 +14,19 @@ Or use test_browser.py which auto-manages the agent worker.
 """
 
 import asyncio
+import functools
 import json
 import os
 import re
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv(".env.local")
@@ -36,9 +42,18 @@ from livekit.agents import (
     llm,
 )
 from livekit.agents.voice.room_io import RoomOptions
-from livekit.plugins import anthropic, openai, silero, sarvam
+from livekit.plugins import silero, sarvam
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+# Only import the LLM plugin we'll actually use (see _create_llm) — the
+# Anthropic SDK alone is a heavy import. Plugins self-register on import,
+# which LiveKit requires to happen on the main thread, so preload it here
+# rather than inside the job; _create_llm's own import is then a cache hit.
+if os.environ.get("LLM_PROVIDER", "claude").lower() == "claude":
+    from livekit.plugins import anthropic  # noqa: F401
+else:
+    from livekit.plugins import openai  # noqa: F401
+
 logger = logging.getLogger("price-caller.agent")
 
 # ---------------------------------------------------------------------------
@@ -101,28 +116,46 @@ CLAUDE_MODEL = os.environ.get("CLAUDE_MODEL", "claude-haiku-4-5-20251001")
 # ---------------------------------------------------------------------------
 # Per-call file logger — saves all logs for each call session to logs/ dir
 # ---------------------------------------------------------------------------
-def _setup_call_logger(store_name: str) -> tuple[logging.FileHandler, str]:
-    """Create a per-call log file and attach a file handler to the root logger.
-
-    Returns (handler, log_filepath) so the handler can be removed when the call ends.
+def _setup_call_logger(safe_store: str, call_ts: str) -> tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener, str]:
+    """Create a per-call log file and attach a queue handler to the root logger.
+
+    Records are formatted in the caller but written by a QueueListener thread,
+    so audio/LiveKit callbacks never block on disk I/O.
+    The file is logs/{safe_store}_{call_ts}.log — the same prefix as the
+    call's transcript, so the two can be correlated.
+    Returns (handler, listener, log_filepath) — pass the first two to
+    _teardown_call_logger() when the call ends.
     """
     logs_dir = Path(__file__).parent / "logs"
     logs_dir.mkdir(exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = logs_dir / f"{store_name.replace(' ', '_')}_{ts}.log"
+    log_file = logs_dir / f"{safe_store}_{call_ts}.log"
 
-    handler = logging.FileHandler(str(log_file), encoding="utf-8")
-    handler.setLevel(logging.DEBUG)
-    handler.setFormatter(logging.Formatter(
+    file_handler = logging.FileHandler(str(log_file), encoding="utf-8")
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(logging.Formatter(
         "%(asctime)s [%(name)s] %(levelname)s: %(message)s",
         datefmt="%H:%M:%S",
     ))
 
+    log_queue = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.setLevel(logging.DEBUG)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+
     # Attach to root logger so it captures logs from all livekit.* loggers too
     root = logging.getLogger()
     root.addHandler(handler)
     logger.info(f"[LOG] Per-call log file: {log_file}")
-    return handler, str(log_file)
+    return handler, listener, str(log_file)
+
+
+def _teardown_call_logger(handler: logging.Handler, listener: logging.handlers.QueueListener) -> None:
+    """Detach the per-call handler, drain queued records to disk, close the file."""
+    logging.getLogger().removeHandler(handler)
+    listener.stop()  # processes everything still queued before returning
+    for h in listener.handlers:
+        h.close()
 
 
 # ---------------------------------------------------------------------------
@@ -166,30 +199,49 @@ class SanitizedAgent(Agent):
                     item.content = [text + " [interrupted]"]
 
         # --- Log FULL message tree sent to the LLM ---
-        try:
-            messages, _ = chat_ctx.to_provider_format("openai")
-            logger.info(f"[LLM REQUEST] {len(messages)} messages")
-            logger.info(f"[LLM MESSAGES]\n{json.dumps(messages, indent=2, ensure_ascii=False)}")
-        except Exception as e:
-            logger.warning(f"[LLM REQUEST] failed to log messages: {e}")
+        # Serializing the whole context is O(history) per turn — skip it
+        # entirely when nothing would record the result.
+        if logger.isEnabledFor(logging.INFO):
+            try:
+                messages, _ = chat_ctx.to_provider_format("openai")
+                logger.info(f"[LLM REQUEST] {len(messages)} messages")
+                logger.info(f"[LLM MESSAGES]\n{json.dumps(messages, indent=2, ensure_ascii=False)}")
+            except Exception as e:
+                logger.warning(f"[LLM REQUEST] failed to log messages: {e}")
 
         # --- Forward to default LLM node, cleaning output for TTS ---
         # Use buffered normalizer to prevent number splitting across chunks.
         # E.g. "28" + "000" → "attaaees hazaar" (not "attaaees" + "zero")
         normalizer = _NumberBufferedNormalizer()
+
+        def _process_str(chunk):
+            chunk = normalizer.process(chunk)
+            if chunk.strip():  # skip empty chunks but preserve leading/trailing spaces
+                self._last_response_text += chunk
+                return chunk
+            return None
+
+        def _process_delta_chunk(chunk):
+            delta = chunk.delta
+            if delta is not None and isinstance(delta.content, str):
+                delta.content = normalizer.process(delta.content)
+                self._last_response_text += delta.content
+            return chunk
+
+        # Chunk handling is resolved once per chunk type, not re-probed per chunk
+        handlers = {}
         async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
-            if isinstance(chunk, str):
-                chunk = _strip_think_tags(chunk)
-                chunk = normalizer.process(chunk)
-                if chunk.strip():  # skip empty chunks but preserve leading/trailing spaces
-                    self._last_response_text += chunk
-                    yield chunk
-            elif hasattr(chunk, "delta") and isinstance(getattr(chunk.delta, "content", None), str):
-                chunk.delta.content = _strip_think_tags(chunk.delta.content)
-                chunk.delta.content = normalizer.process(chunk.delta.content)
-                self._last_response_text += chunk.delta.content
-                yield chunk
-            else:
+            process = handlers.get(type(chunk))
+            if process is None:
+                if isinstance(chunk, str):
+                    process = _process_str
+                elif hasattr(chunk, "delta"):
+                    process = _process_delta_chunk
+                else:
+                    process = _identity
+                handlers[type(chunk)] = process
+            chunk = process(chunk)
+            if chunk is not None:
                 yield chunk
 
         # Flush any remaining buffered digits at end of stream
@@ -219,12 +271,12 @@ class SanitizedAgent(Agent):
         """Ensure first non-system message is from the user.
         Required by vLLM/Qwen. If the first non-system message is assistant
         (e.g. the greeting), inject a synthetic user message before it instead
-        of stripping it — this preserves the greeting as conversational anchor."""
-        ctx = chat_ctx.copy()
-        items = ctx.items
+        of stripping it — this preserves the greeting as conversational anchor.
 
+        Returns chat_ctx itself when it is already valid (the common case);
+        only copies when a synthetic message has to be inserted."""
         # Find first ChatMessage that isn't system
-        for i, item in enumerate(items):
+        for i, item in enumerate(chat_ctx.items):
             if getattr(item, "type", None) != "message":
                 continue
             if item.role == "system":
@@ -239,22 +291,35 @@ class SanitizedAgent(Agent):
                     role="user",
                     content=["[call connected]"],
                 )
-                items.insert(i, synthetic)
+                ctx = chat_ctx.copy()
+                ctx.items.insert(i, synthetic)
+                return ctx
             break
 
-        return ctx
+        return chat_ctx
+
+
+def _identity(x):
+    return x
 
 
 # Regex to strip Qwen3 thinking blocks from streamed text (only applies when using Qwen LLM)
 _THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
 _THINK_OPEN_RE = re.compile(r"<think>.*", re.DOTALL)
+_ACTION_RE = re.compile(r"[\*\(\[][a-zA-Z\s]+[\*\)\]]")
 
+# Everything TTS must never read, in one alternation so each chunk is scanned
+# once: closed think blocks, an unclosed think tag (streaming), action markers.
+_STRIP_RE = re.compile(
+    "|".join((_THINK_RE.pattern, _THINK_OPEN_RE.pattern, _ACTION_RE.pattern)),
+    re.DOTALL,
+)
 
-def _strip_think_tags(text: str) -> str:
-    """Remove <think>...</think> blocks from Qwen3 output so TTS doesn't read them."""
-    text = _THINK_RE.sub("", text)
-    text = _THINK_OPEN_RE.sub("", text)  # handle unclosed tag (streaming)
-    return text
+
+def _strip_markup(text: str) -> str:
+    """Remove everything TTS must not read: <think>...</think> blocks, an
+    unclosed <think> tail (mid-stream) and action markers like *pauses*."""
+    return _STRIP_RE.sub("", text)
 
 
 # Hindi/Hinglish marker words — if a response >20 chars has NONE of these,
@@ -322,7 +387,18 @@ _fallback_idx = 0
 # We handle: action markers, spacing fixes, and number→Hindi word conversion
 # so the TTS doesn't read "36000" as "thirty-six thousand".
 
-_ACTION_RE = re.compile(r"[\*\(\[][a-zA-Z\s]+[\*\)\]]")
+# Spacing fixes, merged into one alternation so each chunk is scanned once.
+# The transitions are zero-width (lookarounds), so adjacent boundaries like
+# "a5b" are all handled in the same pass; each match is replaced by one space:
+#   - collapse runs of spaces
+#   - lowercase→uppercase ("puraneAC" → "purane AC")
+#   - letter→digit and digit→letter ("5star" → "5 star")
+_SPACING_RE = re.compile(
+    r" {2,}"
+    r"|(?<=[a-z])(?=[A-Z])"
+    r"|(?<=[a-zA-Z])(?=\d)"
+    r"|(?<=\d)(?=[a-zA-Z])"
+)
 
 # Regex to detect trailing digits at end of a chunk
 _TRAILING_DIGITS_RE = re.compile(r"(\d+)$")
@@ -350,8 +426,9 @@ class _NumberBufferedNormalizer:
         Returns the normalized text ready for TTS, or empty string if
         the entire chunk was buffered.
         """
-        # Prepend any buffered digits from the previous chunk
-        chunk = self._buffer + chunk
+        # Strip think tags / action markers before buffering, so digits inside
+        # a think block are never held over. Then prepend buffered digits.
+        chunk = self._buffer + _STRIP_RE.sub("", chunk)
         self._buffer = ""
 
         # Check if the chunk ends with digits — buffer them for the next chunk
@@ -362,13 +439,13 @@ class _NumberBufferedNormalizer:
 
         # Normalize whatever we can emit now
         if chunk:
-            return _normalize_for_tts(chunk)
+            return _normalize_unmarked(chunk)
         return ""
 
     def flush(self) -> str:
         """Flush any remaining buffered digits at end of stream."""
         if self._buffer:
-            result = _normalize_for_tts(self._buffer)
+            result = _normalize_unmarked(self._buffer)
             self._buffer = ""
             return result
         return ""
@@ -467,6 +544,8 @@ _HINDI_ONES = {
     91: "ikyaanbe", 92: "baanbe", 93: "tirranbe", 94: "chauranbe", 95: "pachranbe",
     96: "chhiyanbe", 97: "sattanbe", 98: "atthanbe", 99: "ninyanbe",
 }
+# Dense 0..99 keys — index a tuple on the hot path instead of hashing into the dict
+_HINDI_ONES_T = tuple(_HINDI_ONES[i] for i in range(100))
 
 
 def _number_to_hindi(n: int) -> str:
@@ -499,20 +578,25 @@ def _number_to_hindi(n: int) -> str:
             parts.append(_number_to_hindi(thousands) + " hazaar")
             n = remainder
     if n >= 100:  # sau
-        parts.append(_HINDI_ONES[n // 100] + " sau")
+        parts.append(_HINDI_ONES_T[n // 100] + " sau")
         n %= 100
     if n > 0:
-        parts.append(_HINDI_ONES[n])
+        parts.append(_HINDI_ONES_T[n])
 
     return " ".join(parts)
 
 
 # Match standalone numbers: integers and decimals (not inside words)
 _NUMBER_RE = re.compile(r"\b(\d[\d,]*\.?\d*)\b")
+# ASCII digits, for the fast path in _replace_numbers. \d also matches other
+# Unicode digits (Devanagari ०-९, ...), so only ASCII text may use it.
+_DIGITS = frozenset("0123456789")
 
 
 def _replace_numbers(text: str) -> str:
     """Replace digit numbers with Hindi words for natural TTS pronunciation."""
+    if text.isascii() and _DIGITS.isdisjoint(text):
+        return text  # most chunks have no digits — skip the regex scan
     def _repl(m):
         raw = m.group(1).replace(",", "")
         # Handle decimals: "1.5" → "dedh" (special case) or "ek point paanch"
@@ -523,32 +607,33 @@ def _replace_numbers(text: str) -> str:
                 return "dhaai"
             int_part, dec_part = raw.split(".", 1)
             result = _number_to_hindi(int(int_part)) if int_part else ""
-            result += " point " + " ".join(_HINDI_ONES[int(d)] for d in dec_part if d.isdigit())
+            result += " point " + " ".join(_HINDI_ONES_T[int(d)] for d in dec_part if d.isdigit())
             return result.strip()
         try:
             return _number_to_hindi(int(raw))
-        except (ValueError, KeyError):
+        except (ValueError, IndexError):
             return m.group(0)  # leave as-is if conversion fails
     return _NUMBER_RE.sub(_repl, text)
 
 
 def _normalize_for_tts(text: str) -> str:
     """Clean up LLM output for TTS — strip markers, fix spacing, convert numbers."""
-    # Strip roleplay action markers
-    text = _ACTION_RE.sub("", text)
+    return _normalize_unmarked(_STRIP_RE.sub("", text))
+
+
+# Pure str → str, and streamed chunks repeat a lot ("achha", "ji", ...) —
+# memoize so duplicates skip the regex work.
+@functools.lru_cache(maxsize=4096)
+def _normalize_unmarked(text: str) -> str:
+    """_normalize_for_tts for text already passed through _STRIP_RE."""
     # Replace newlines with spaces (LLM sometimes inserts \n\n between sentences)
     text = text.replace("\n", " ")
     # Transliterate any Devanagari that leaked through the LLM (safety net)
     text = _transliterate_devanagari(text)
     # Convert digit numbers to Hindi words
     text = _replace_numbers(text)
-    # Insert space between lowercase→uppercase transitions (fixes "puraneAC" → "purane AC")
-    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
-    # Insert space before digit→letter or letter→digit transitions (fixes "5star" → "5 star")
-    text = re.sub(r"([a-zA-Z])(\d)", r"\1 \2", text)
-    text = re.sub(r"(\d)([a-zA-Z])", r"\1 \2", text)
-    # Collapse multiple spaces
-    text = re.sub(r" {2,}", " ", text)
+    # Fix spacing in one pass (see _SPACING_RE)
+    text = _SPACING_RE.sub(" ", text)
     return text
 
 # ---------------------------------------------------------------------------
@@ -650,6 +735,143 @@ You: "Theek hai ji, main soch ke bataata hoon. Dhanyavaad." → then call end_ca
 
 
 
+# One transcript message. Kept as a tuple for the life of the call (smaller
+# than a dict); converted to the JSON message shape only when written out.
+# `t` is seconds since the call started (time.monotonic() offset).
+TranscriptEntry = namedtuple("TranscriptEntry", ["role", "text", "t", "interrupted"], defaults=[False])
+
+
+def _with_wall_time(entry: TranscriptEntry, start: datetime) -> dict:
+    """Build a transcript message dict, with an ISO "time" relative to `start`."""
+    out = {"role": entry.role, "text": entry.text,
+           "time": (start + timedelta(seconds=entry.t)).isoformat()}
+    if entry.interrupted:
+        out["interrupted"] = True
+    return out
+
+
+def _start_call_timer(seconds: float, on_expire) -> asyncio.Task:
+    """Schedule the coroutine function on_expire to run after `seconds`.
+
+    Cancelling the returned task before then stops it. Only the sleep is
+    cancellable: once on_expire has started it runs to completion.
+    """
+    def _fire(task):
+        if not task.cancelled():
+            asyncio.create_task(on_expire())
+
+    timer = asyncio.create_task(asyncio.sleep(seconds))
+    timer.add_done_callback(_fire)
+    return timer
+
+
+class _TranscriptJournal:
+    """Append-only JSONL copy of a call's transcript, kept until the full
+    transcript JSON is saved.
+
+    Line 1 is a header with the call metadata and "started" (wall clock);
+    every later line is one TranscriptEntry as a dict, flushed as it arrives,
+    so the conversation survives a worker crash. Journals left behind are
+    turned into transcripts by _recover_journals().
+    """
+
+    def __init__(self, path: Path, header: dict):
+        self.path = path
+        self._header = header
+        self._file = None  # opened on the first message
+
+    def append(self, entry: TranscriptEntry):
+        if self._file is None:
+            self.path.parent.mkdir(exist_ok=True)
+            self._file = open(self.path, "ab")
+            self._file.write(orjson.dumps(self._header) + b"\n")
+        self._file.write(orjson.dumps(entry._asdict()) + b"\n")
+        self._file.flush()
+
+    def close(self):
+        """Release the file handle, leaving the journal on disk for recovery."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Close and delete the journal — the full transcript is on disk."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+def _read_journal(path: Path) -> dict | None:
+    """Rebuild transcript JSON data from a journal, or None if it has no messages.
+
+    A torn last line (crash mid-write) ends the message list.
+    """
+    lines = path.read_bytes().splitlines()
+    if not lines:
+        return None
+    header = orjson.loads(lines[0])
+    start = datetime.fromisoformat(header["started"])
+    messages = []
+    for line in lines[1:]:
+        try:
+            messages.append(_with_wall_time(TranscriptEntry(**orjson.loads(line)), start))
+        except (orjson.JSONDecodeError, TypeError):
+            break
+    if not messages:
+        return None
+    return {
+        "store_name": header.get("store_name", ""),
+        "product_description": header.get("product_description", ""),
+        "room": header.get("room", ""),
+        "phone": header.get("phone", ""),
+        "timestamp": datetime.fromtimestamp(path.stat().st_mtime).isoformat(),
+        "messages": messages,
+        "recovered": True,
+    }
+
+
+def _recover_journals(transcript_dir: Path, min_age: float = 600.0) -> list[Path]:
+    """Turn journals orphaned by a crashed worker into transcript JSON files.
+
+    Journals modified within `min_age` seconds may belong to a live call and
+    are left alone. Returns the transcripts written.
+    """
+    recovered = []
+    for path in transcript_dir.glob("*.jsonl"):
+        try:
+            if time.time() - path.stat().st_mtime < min_age:
+                continue
+            data = _read_journal(path)
+            out = path.with_suffix(".json")
+            # An existing .json means the save succeeded and only the unlink didn't
+            if data is not None and not out.exists():
+                out.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                recovered.append(out)
+                logger.info(f"[TRANSCRIPT] Recovered {len(data['messages'])} messages to {out}")
+            path.unlink()
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[TRANSCRIPT] Could not recover {path}: {e}")
+    return recovered
+
+
+@functools.lru_cache(maxsize=128)
+def _build_instructions(store_name: str, product_description: str, nearby_area: str) -> str:
+    """DEFAULT_INSTRUCTIONS plus the per-call product/store/area block.
+
+    Cached so repeat calls to the same store/product reuse one string object.
+    """
+    area_info = f'\nYOUR AREA: {nearby_area} — if asked where you live, say "{nearby_area} mein rehta hoon" or "{nearby_area} side".' if nearby_area else ""
+    return DEFAULT_INSTRUCTIONS + f"""
+PRODUCT: {product_description}
+STORE: {store_name}{area_info}
+"""
+
+
+@functools.lru_cache(maxsize=128)
+def _build_greeting(store_name: str, product_description: str) -> str:
+    """Default opening line when the dispatch doesn't supply a greeting."""
+    return f"Hello, yeh {store_name} hai? {product_description} ke baare mein poochna tha."
+
+
 # ---------------------------------------------------------------------------
 # LLM provider selection
 # ---------------------------------------------------------------------------
@@ -662,6 +884,7 @@ def _create_llm():
     provider = os.environ.get("LLM_PROVIDER", "claude").lower()
 
     if provider == "claude":
+        from livekit.plugins import anthropic
         logger.info(f"[LLM] Using Claude ({CLAUDE_MODEL})")
         return anthropic.LLM(
             model=CLAUDE_MODEL,
@@ -671,6 +894,7 @@ def _create_llm():
             caching="ephemeral",
         )
     else:
+        from livekit.plugins import openai
         logger.info("[LLM] Using Qwen3-4B-Instruct (vLLM)")
         return openai.LLM(
             model=os.environ.get("LLM_MODEL", "Qwen/Qwen3-4B-Instruct-2507-FP8"),
@@ -689,9 +913,13 @@ async def entrypoint(ctx: JobContext):
     Handles the full lifecycle: connect → dial → converse → hangup.
     """
     logger.info(f"Agent entrypoint called. Room: {ctx.room.name}")
+    # Message timestamps are monotonic offsets from here; ISO strings are only
+    # built when the transcript is written out.
+    start_wall = datetime.now()
+    start_mono = time.monotonic()
 
     # Parse metadata from the dispatch
-    metadata = json.loads(ctx.job.metadata or "{}")
+    metadata = orjson.loads(ctx.job.metadata or "{}")
     phone_number = metadata.get("phone", "")
     store_name = metadata.get("store_name", "Unknown Store")
     product_description = metadata.get("product_description", metadata.get("ac_model", "appliance"))
@@ -702,24 +930,24 @@ async def entrypoint(ctx: JobContext):
     is_browser = not phone_number
     logger.info(f"{'Browser session' if is_browser else f'Calling {store_name} at {phone_number}'} for {product_description}")
 
+    # Shared filename prefix for this call's log, transcript journal and transcript
+    safe_store = store_name.replace(' ', '_')
+    call_ts = start_wall.strftime("%Y%m%d_%H%M%S")
+
     # Set up per-call log file (captures all agent, LLM, and session logs for this call)
-    call_log_handler, call_log_path = _setup_call_logger(store_name)
+    call_log_handler, call_log_listener, call_log_path = _setup_call_logger(safe_store, call_ts)
 
     # Connect agent to the room
     await ctx.connect()
 
     # Build custom instructions with the product, store name, and nearby area
-    greeting = metadata.get("greeting") or f"Hello, yeh {store_name} hai? {product_description} ke baare mein poochna tha."
+    greeting = metadata.get("greeting") or _build_greeting(store_name, product_description)
     if instructions_override:
         # Pipeline mode: use the dynamically generated prompt
         instructions = instructions_override
     else:
         # Default mode: use DEFAULT_INSTRUCTIONS with product metadata
-        area_info = f'\nYOUR AREA: {nearby_area} — if asked where you live, say "{nearby_area} mein rehta hoon" or "{nearby_area} side".' if nearby_area else ""
-        instructions = DEFAULT_INSTRUCTIONS + f"""
-PRODUCT: {product_description}
-STORE: {store_name}{area_info}
-"""
+        instructions = _build_instructions(store_name, product_description, nearby_area)
 
     # Voice config — read from dispatch metadata (for A/B experiments) or use defaults
     voice_speaker = metadata.get("voice_speaker", "shubh") if metadata else "shubh"
@@ -768,6 +996,28 @@ STORE: {store_name}{area_info}
 
     # ---- Transcript collection & conversation logging ----
     transcript_lines = []  # Collect messages for saving to file
+    transcript_dir = Path(__file__).parent / "transcripts"
+    journal = _TranscriptJournal(
+        transcript_dir / f"{safe_store}_{call_ts}.jsonl",
+        {
+            "started": start_wall.isoformat(),
+            "store_name": store_name,
+            "product_description": product_description,
+            "room": ctx.room.name,
+            "phone": phone_number or "browser",
+        },
+    )
+    _transcript_saved = False
+
+    def _record(entry: TranscriptEntry):
+        """Collect a transcript message and append it to the crash-recovery journal."""
+        transcript_lines.append(entry)
+        if _transcript_saved:
+            return  # late message after the final save — nothing to recover
+        try:
+            journal.append(entry)
+        except OSError as e:
+            logger.warning(f"[TRANSCRIPT] Journal write failed: {e}")
 
     # Create agent and wire up transcript reference for end_call capture
     agent = SanitizedAgent(instructions=instructions)
@@ -791,7 +1041,7 @@ STORE: {store_name}{area_info}
             if _is_likely_garbage(ev.transcript):
                 logger.warning(f"[STT GARBAGE] Likely noise artifact: '{ev.transcript}'")
             logger.info(f"[USER] {ev.transcript}")
-            transcript_lines.append({"role": "user", "text": ev.transcript, "time": datetime.now().isoformat()})
+            _record(TranscriptEntry("user", ev.transcript, time.monotonic() - start_mono))
 
     @session.on("conversation_item_added")
     def on_conversation_item(ev):
@@ -802,10 +1052,7 @@ STORE: {store_name}{area_info}
             if was_interrupted:
                 logger.warning(f"[INTERRUPTED] Agent speech truncated: '{text}'")
             logger.info(f"[LLM] {'[TRUNCATED] ' if was_interrupted else ''}{text}")
-            transcript_lines.append({
-                "role": "assistant", "text": text, "time": datetime.now().isoformat(),
-                **({"interrupted": True} if was_interrupted else {}),
-            })
+            _record(TranscriptEntry("assistant", text, time.monotonic() - start_mono, bool(was_interrupted)))
 
     @session.on("function_tools_executed")
     def on_tools_executed(ev):
@@ -864,7 +1111,6 @@ STORE: {store_name}{area_info}
             logger.error(f"[SESSION ERROR] source={source_name}, error={error}")
 
     # ---- Transcript & log cleanup (idempotent — safe to call multiple times) ----
-    _transcript_saved = False
     _log_closed = False
 
     def _save_transcript():
@@ -872,26 +1118,28 @@ STORE: {store_name}{area_info}
         if _transcript_saved or not transcript_lines:
             return
         _transcript_saved = True
-        transcript_dir = Path(__file__).parent / "transcripts"
         transcript_dir.mkdir(exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = transcript_dir / f"{store_name.replace(' ', '_')}_{ts}.json"
+        filename = transcript_dir / f"{safe_store}_{call_ts}.json"
         data = {
             "store_name": store_name,
             "product_description": product_description,
             "room": ctx.room.name,
             "phone": phone_number or "browser",
             "timestamp": datetime.now().isoformat(),
-            "messages": transcript_lines,
+            "messages": [_with_wall_time(m, start_wall) for m in transcript_lines],
         }
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # orjson writes UTF-8 directly (Hindi text stays unescaped)
+            with open(filename, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
             logger.info(f"[TRANSCRIPT] Saved to {filename}")
         except Exception as e:
-            logger.error(f"[TRANSCRIPT] Failed to save: {e}")
+            logger.error(f"[TRANSCRIPT] Failed to save: {e} (messages kept in {journal.path})")
             return
 
+        # Full transcript is on disk — the crash-recovery journal is redundant now
+        journal.discard()
+
         # Post-call quality analysis — writes companion .analysis.json
         try:
             from call_analysis import analyze_transcript
@@ -912,22 +1160,40 @@ STORE: {store_name}{area_info}
         if _log_closed:
             return
         _log_closed = True
-        logging.getLogger().removeHandler(call_log_handler)
-        call_log_handler.close()
+        _teardown_call_logger(call_log_handler, call_log_listener)
         logger.info(f"[LOG] Call log saved to {call_log_path}")
 
     # Wire save function onto agent so end_call can use it
     agent._save_transcript_fn = _save_transcript
 
+    # Runs however the job ends (including the early returns below). If the
+    # save fails the journal is only closed, and left for _recover_journals.
+    async def _on_shutdown():
+        _save_transcript()
+        journal.close()
+        _close_log()
+
+    ctx.add_shutdown_callback(_on_shutdown)
+
+    # Max-duration timer (SIP calls only) — cancelled when the call ends so it
+    # doesn't outlive the call holding a reference to ctx
+    timeout_task = None
+
+    def _cancel_timeout():
+        if timeout_task is not None and not timeout_task.done():
+            timeout_task.cancel()
+
     @session.on("close")
     def on_close(ev):
         logger.info(f"[SESSION CLOSE] reason={ev.reason}")
+        _cancel_timeout()
         _save_transcript()
         _close_log()
 
     @ctx.room.on("participant_disconnected")
     def on_participant_left(participant):
         logger.info(f"Participant {participant.identity} left — saving transcript and closing call log")
+        _cancel_timeout()
         _save_transcript()
         _close_log()
 
@@ -964,9 +1230,10 @@ STORE: {store_name}{area_info}
         session.say(greeting, add_to_chat_ctx=True)
 
     if not is_browser:
-        # Set a maximum call duration timer (SIP calls only)
-        async def call_timeout():
-            await asyncio.sleep(300)  # 5 minutes max
+        # Set a maximum call duration timer (SIP calls only). Only the sleep is
+        # cancellable — once it fires, hanging up runs to completion even
+        # though each removal triggers on_participant_left.
+        async def end_call_on_timeout():
             logger.info("Call timeout reached, saving transcript and ending call")
             _save_transcript()
             for participant in ctx.room.remote_participants.values():
@@ -980,13 +1247,15 @@ STORE: {store_name}{area_info}
                 except Exception:
                     pass
 
-        asyncio.create_task(call_timeout())
+        timeout_task = _start_call_timer(300, end_call_on_timeout)  # 5 minutes max
 
 
 # ---------------------------------------------------------------------------
 # Run the agent worker
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
+    # Transcripts from calls whose worker crashed before saving
+    _recover_journals(Path(__file__).parent / "transcripts")
     agents.cli.run_app(
         agents.WorkerOptions(
             entrypoint_fnc=entrypoint,
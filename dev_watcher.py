@@ -11,23 +11,38 @@ Usage:
     python dev_watcher.py --live       # Include live API tests
     python dev_watcher.py --no-docs    # Skip doc count updates
     python dev_watcher.py --no-analysis # Skip transcript analysis
+    python dev_watcher.py --parallel   # Full-suite runs across cores (pytest-xdist)
 """
 
 import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import queue
 import re
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from threading import Timer
+from threading import Lock, Thread
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import orjson
 
 PROJECT_ROOT = Path(__file__).parent
 TRANSCRIPTS_DIR = PROJECT_ROOT / "transcripts"
+TESTS_DIR = PROJECT_ROOT / "tests"
+LAST_FAILED_CACHE = PROJECT_ROOT / ".pytest_cache" / "v" / "cache" / "lastfailed"
 DOC_FILES = [PROJECT_ROOT / "README.md", PROJECT_ROOT / "tests.md"]
 
+# With --parallel, full-suite runs are spread across all cores when
+# pytest-xdist is available. loadfile keeps each test module on one worker so
+# module-level fixtures are built once. Targeted runs stay serial: starting
+# the xdist pool costs more than it saves on a handful of tests.
+_XDIST_ARGS = ["-n", "auto", "--dist=loadfile"] if importlib.util.find_spec("xdist") else []
+
 
 # ---------------------------------------------------------------------------
 # Doc count updater — updates test counts in README.md and tests.md
@@ -39,72 +54,281 @@ def _extract_test_count(output: str) -> int | None:
     return int(m.group(1)) if m else None
 
 
+# Every doc form that carries the test count, matching just the number:
+#   "141 passed" (also "# 141 passed", "**Total: 141 passed**"),
+#   "141 + 26 live" (live count preserved), "pytest test suite (141 unit",
+#   "verify all 141 tests"
+_COUNT_RE = re.compile(
+    rb'\b\d+(?= passed\b)'
+    rb'|(?<=# )\d+(?= passed)'
+    rb'|\d+(?= \+ \d+ live)'
+    rb'|(?<=pytest test suite \()\d+(?= unit)'
+    rb'|(?<=verify all )\d+(?= tests)'
+)
+
+
 def _update_file_counts(path: Path, count: int):
     """Update test count patterns in a doc file."""
-    if not path.exists():
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
         return
-    text = path.read_text()
-    original = text
-
-    # "# 141 passed" → "# {count} passed"
-    text = re.sub(r'# \d+ passed', f'# {count} passed', text)
-    # "141 passed" in inline code or prose
-    text = re.sub(r'(\b)\d+ passed\b', f'{count} passed', text)
-    # "**Total: 141 passed**"
-    text = re.sub(r'\*\*Total: \d+ passed\*\*', f'**Total: {count} passed**', text)
-    # "141 + 26 live tests" → preserve live count
-    text = re.sub(r'\d+( \+ \d+ live)', f'{count}\\1', text)
-    # "pytest test suite (141 unit" → update unit count
-    text = re.sub(r'pytest test suite \(\d+ unit', f'pytest test suite ({count} unit', text)
-    # "verify all 141 tests"
-    text = re.sub(r'verify all \d+ tests', f'verify all {count} tests', text)
-
-    if text != original:
-        path.write_text(text)
+
+    # One scan over the raw bytes; only numbers that differ are spliced in,
+    # and a doc that's already current is never copied or rewritten
+    new = str(count).encode()
+    out = None
+    last = 0
+    for m in _COUNT_RE.finditer(data):
+        if m.group() == new:
+            continue
+        if out is None:
+            out = bytearray()
+        out += data[last:m.start()]
+        out += new
+        last = m.end()
+
+    if out is not None:
+        out += data[last:]
+        path.write_bytes(out)
         print(f"  Updated {path.name} (test count → {count})")
 
 
+# Count last written (or confirmed) per doc, so unchanged counts skip the I/O
+_last_counts: dict[Path, int] = {}
+
+
 def update_doc_counts(count: int):
     """Update test counts across all doc files."""
-    for doc in DOC_FILES:
-        _update_file_counts(doc, count)
+    stale = [doc for doc in DOC_FILES if _last_counts.get(doc) != count]
+    if not stale:
+        return
+    # Docs are independent files; overlap their read/write I/O
+    with ThreadPoolExecutor(max_workers=min(4, len(stale))) as ex:
+        list(ex.map(lambda doc: _update_file_counts(doc, count), stale))
+    for doc in stale:
+        _last_counts[doc] = count
 
 
 # ---------------------------------------------------------------------------
 # Pytest runner
 # ---------------------------------------------------------------------------
-def run_tests(include_live: bool = False) -> tuple[bool, int | None]:
-    """Run pytest and return (success, test_count)."""
-    cmd = [sys.executable, "-m", "pytest", "tests/", "-v", "--tb=short", "-q"]
+# Each worker process runs one pytest session. stdin line 1 is a JSON list of
+# modules to import up front, line 2 the JSON pytest argv. pytest output is
+# streamed to stdout, then a NUL-prefixed {"rc": ..., "modules": [...]} line
+# ends the run; "modules" lists the third-party modules it imported, which
+# the next worker preloads.
+_DAEMON_SRC = r"""
+import importlib, json, os, sys
+
+root = sys.argv[1] + os.sep
+for name in json.loads(sys.stdin.readline() or "[]"):
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+line = sys.stdin.readline()
+if line:
+    import pytest
+    rc = pytest.main(json.loads(line))
+    modules = [
+        name for name, mod in list(sys.modules.items())
+        if not (getattr(mod, "__file__", None) or "").startswith(root)
+        or "site-packages" in mod.__file__
+    ]
+    sys.stdout.flush()
+    sys.stdout.write("\0" + json.dumps({"rc": int(rc), "modules": modules}) + "\n")
+    sys.stdout.flush()
+"""
+
+
+class _PytestDaemon:
+    """Runs each pytest session in a fresh, pre-started worker process.
+
+    Every run gets a new interpreter, so edited project code is never stale.
+    As soon as a run finishes the next worker is started and imports the
+    third-party modules that run used (LiveKit, Anthropic, ...), so by the
+    next save interpreter startup and those imports are already paid.
+    """
+
+    def __init__(self, root: Path = PROJECT_ROOT):
+        self._root = root
+        self._next = None  # warmed-up worker waiting for its pytest args
+        self._lock = Lock()
+
+    def _spawn(self, preload: list[str]) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            [sys.executable, "-u", "-c", _DAEMON_SRC, str(self._root)],
+            cwd=str(self._root),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, bufsize=1,
+        )
+        proc.stdin.write(json.dumps(preload) + "\n")
+        proc.stdin.flush()
+        return proc
+
+    def run(self, args: list[str]) -> tuple[int, str]:
+        """Run pytest with args, teeing output. Returns (returncode, output)."""
+        with self._lock:
+            proc = self._next
+            self._next = None
+            if proc is not None and proc.poll() is not None:
+                self._discard(proc)
+                proc = None
+            if proc is not None:
+                try:
+                    self._send(proc, args)
+                except OSError:
+                    # Died between the poll and the write
+                    self._discard(proc)
+                    proc = None
+            if proc is None:
+                proc = self._spawn([])
+                self._send(proc, args)
+
+            # A worker that dies before the end-of-run line counts as a failure
+            rc, modules, buf = 1, [], []
+            for line in proc.stdout:
+                if line.startswith("\0"):
+                    result = json.loads(line[1:])
+                    rc, modules = result["rc"], result["modules"]
+                    break
+                sys.stdout.write(line)
+                buf.append(line)
+            proc.stdout.close()
+            proc.wait()
+
+            self._next = self._spawn(modules)
+            return rc, "".join(buf)
+
+    @staticmethod
+    def _send(proc: subprocess.Popen, args: list[str]):
+        proc.stdin.write(json.dumps(args) + "\n")
+        proc.stdin.close()
+
+    @staticmethod
+    def _discard(proc: subprocess.Popen):
+        proc.kill()
+        proc.wait()
+        for pipe in (proc.stdin, proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass  # unflushed args for a dead worker
+
+    def close(self):
+        with self._lock:
+            proc, self._next = self._next, None
+            if proc is not None:
+                # The waiting worker hasn't started a run; nothing to lose
+                self._discard(proc)
+
+
+_daemon = _PytestDaemon()
+
+
+def _has_last_failed() -> bool:
+    """True if pytest's cache records failures, i.e. --lf would run a subset."""
+    try:
+        return bool(json.loads(LAST_FAILED_CACHE.read_text()))
+    except (OSError, ValueError):
+        return False
+
+
+def run_tests(
+    include_live: bool = False,
+    targets: list[str] | None = None,
+    last_failed: bool = False,
+    parallel: bool = False,
+) -> tuple[bool, int | None]:
+    """Run pytest and return (success, test_count).
+
+    targets narrows the run to specific test files (default: all of tests/).
+    last_failed reruns recorded failures first and stops there if any exist.
+    parallel uses pytest-xdist, but only when the whole suite will run.
+    """
+    args = [*(targets or ["tests/"]), "--tb=line", "-q", "--no-header"]
+    if last_failed:
+        args.extend(["--lf", "--ff"])
     if include_live:
-        cmd.append("--live")
+        args.append("--live")
+    if parallel and not targets and not (last_failed and _has_last_failed()):
+        args.extend(_XDIST_ARGS)
 
     print(f"\n{'='*60}")
-    print(f"Running: {' '.join(cmd)}")
+    print(f"Running: pytest {' '.join(args)}")
     print(f"{'='*60}")
 
-    result = subprocess.run(cmd, cwd=str(PROJECT_ROOT), capture_output=False)
-    success = result.returncode == 0
-
-    # Re-run capturing output to extract count
-    result_capture = subprocess.run(cmd, cwd=str(PROJECT_ROOT), capture_output=True, text=True)
-    count = _extract_test_count(result_capture.stdout + result_capture.stderr)
-
-    return success, count
+    returncode, output = _daemon.run(args)
+    return returncode == 0, _extract_test_count(output)
 
 
 # ---------------------------------------------------------------------------
 # Transcript analysis
 # ---------------------------------------------------------------------------
+def _wait_settled(path: Path, interval: float = 0.02, stable: int = 2, timeout: float = 2.0):
+    """Wait until path's size is unchanged for `stable` consecutive polls.
+
+    Guards against analyzing a transcript that is still being written.
+    Gives up after timeout and lets the analysis proceed anyway.
+    """
+    deadline = time.monotonic() + timeout
+    last, seen = None, 0
+    while time.monotonic() < deadline:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = None
+        seen = seen + 1 if size == last else 0
+        if seen >= stable:
+            return
+        last = size
+        time.sleep(interval)
+
+
+# call_analysis imports agent_worker (and with it LiveKit); import it on first
+# use only so the watcher starts fast, then keep the bound function
+_analyze = None
+
+
+def _get_analyzer():
+    global _analyze
+    if _analyze is None:
+        from call_analysis import analyze_and_save as _analyze
+    return _analyze
+
+
+def _content_hash(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _needs_analysis(path: Path) -> bool:
+    """Whether an updated transcript should be (re-)analyzed.
+
+    A transcript without an analysis, or whose analysis has no .analysis.sha
+    sidecar, always is. Otherwise the sidecar written after the last analysis
+    decides: unchanged content is skipped.
+    """
+    if not path.with_suffix(".analysis.json").exists():
+        return True
+    try:
+        recorded = path.with_suffix(".analysis.sha").read_text().strip()
+    except FileNotFoundError:
+        return True
+    try:
+        return recorded != _content_hash(path)
+    except OSError:
+        return False  # transcript gone or unreadable; nothing to analyze
+
+
 def run_analysis(path: Path):
     """Run quality analysis on a transcript file."""
     try:
-        from call_analysis import analyze_and_save
-        analysis_path = analyze_and_save(path)
+        digest = _content_hash(path)
+        analysis_path = _get_analyzer()(path)
+        path.with_suffix(".analysis.sha").write_text(digest + "\n")
         # Read back for summary
-        import json
-        with open(analysis_path) as f:
-            result = json.load(f)
+        result = orjson.loads(analysis_path.read_bytes())
         topics = ", ".join(result.get("topics_covered", []))
         print(
             f"  Analysis: score={result['overall_score']}, "
@@ -115,17 +339,116 @@ def run_analysis(path: Path):
         print(f"  Analysis failed: {e}")
 
 
+# Analyses run on a background event loop so the poller thread is never
+# blocked on one; the semaphore bounds how many run at once
+_analysis_loop: asyncio.AbstractEventLoop | None = None
+_analysis_sem: asyncio.Semaphore | None = None
+_in_flight: set[Path] = set()  # touched only on the loop thread
+
+
+def _start_analysis_loop(max_concurrent: int = 4):
+    global _analysis_loop, _analysis_sem
+    _analysis_loop = asyncio.new_event_loop()
+    _analysis_sem = asyncio.Semaphore(max_concurrent)
+    Thread(target=_analysis_loop.run_forever, daemon=True).start()
+
+
+def _stop_analysis_loop():
+    if _analysis_loop is not None:
+        _analysis_loop.call_soon_threadsafe(_analysis_loop.stop)
+
+
+async def _aanalyze(path: Path):
+    # Repeated modify events for a transcript already being analyzed are dropped
+    if path in _in_flight:
+        return
+    _in_flight.add(path)
+    try:
+        async with _analysis_sem:
+            await asyncio.to_thread(_wait_settled, path)
+            await asyncio.to_thread(run_analysis, path)
+    finally:
+        _in_flight.discard(path)
+
+
+def submit_analysis(path: Path):
+    """Queue a transcript for analysis without blocking the caller."""
+    asyncio.run_coroutine_threadsafe(_aanalyze(path), _analysis_loop)
+
+
+# ---------------------------------------------------------------------------
+# Transcript poller — transcripts/ is one flat directory, so a short scandir
+# poll is lighter than watchdog and has predictable latency on every platform
+# ---------------------------------------------------------------------------
+def _poll_transcripts(seen: dict[str, int]):
+    """Yield (path, is_new) for transcripts added or changed since the last poll.
+
+    A missing transcripts/ (e.g. deleted while watching) yields nothing; when
+    it comes back, whatever it then holds counts as new.
+    """
+    try:
+        it = os.scandir(TRANSCRIPTS_DIR)
+    except OSError as e:
+        if seen:
+            print(f"\n  Transcripts unavailable ({e}); still polling")
+            seen.clear()
+        return
+    with it:
+        for entry in it:
+            if not entry.name.endswith(".json") or entry.name.endswith(".analysis.json"):
+                continue
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            previous = seen.get(entry.name)
+            if previous != mtime:
+                seen[entry.name] = mtime
+                yield Path(entry.path), previous is None
+
+
+def _watch_transcripts(interval: float = 0.2):
+    """Poll transcripts/ forever, submitting new or updated transcripts."""
+    seen: dict[str, int] = {}
+    # Baseline: transcripts already present at startup aren't analyzed
+    for _ in _poll_transcripts(seen):
+        pass
+    while True:
+        time.sleep(interval)
+        for path, is_new in _poll_transcripts(seen):
+            if is_new:
+                print(f"\n  New transcript: {path.name}")
+                submit_analysis(path)
+            elif _needs_analysis(path):
+                print(f"\n  Updated transcript: {path.name}")
+                submit_analysis(path)
+
+
 # ---------------------------------------------------------------------------
 # File system event handlers
 # ---------------------------------------------------------------------------
-class CodeChangeHandler(FileSystemEventHandler):
-    """Watches *.py files for changes, debounces, runs pytest."""
+class CodeChangeHandler:
+    """Watches *.py files for changes, debounces, runs pytest.
 
-    def __init__(self, include_live: bool, update_docs: bool):
+    Used as a watchdog event handler. The observer only ever calls
+    dispatch(), so this doesn't subclass FileSystemEventHandler and watchdog
+    is imported by main() alone.
+    """
+
+    def __init__(self, include_live: bool, update_docs: bool, parallel: bool = False):
         self.include_live = include_live
         self.update_docs = update_docs
-        self._timer = None
+        self.parallel = parallel
         self._debounce_sec = 2.0
+        # Paths flow through the queue to one consumer thread, which owns
+        # _pending and runs once per burst of events
+        self._queue: queue.Queue[Path] = queue.Queue()
+        self._pending: set[Path] = set()
+        Thread(target=self._loop, daemon=True).start()
+
+    def dispatch(self, event):
+        if event.event_type == "modified":
+            self.on_modified(event)
 
     def on_modified(self, event):
         if event.is_directory:
@@ -138,46 +461,43 @@ class CodeChangeHandler(FileSystemEventHandler):
             return
 
         print(f"\n  Changed: {path.relative_to(PROJECT_ROOT)}")
-        self._schedule_test_run()
+        self._queue.put_nowait(path)
 
-    def _schedule_test_run(self):
-        if self._timer:
-            self._timer.cancel()
-        self._timer = Timer(self._debounce_sec, self._run)
-        self._timer.start()
+    def _loop(self):
+        while True:
+            self._pending.add(self._queue.get())
+            # Keep absorbing events until the tree has been quiet for the window
+            try:
+                while True:
+                    self._pending.add(self._queue.get(timeout=self._debounce_sec))
+            except queue.Empty:
+                pass
+            # A failed run must not end the only consumer, or the watcher
+            # would keep reporting changes without ever testing them again
+            try:
+                self._run()
+            except Exception as e:
+                print(f"  Test run failed: {e}")
 
     def _run(self):
-        success, count = run_tests(self.include_live)
-        if success and count and self.update_docs:
-            update_doc_counts(count)
-
-
-class TranscriptHandler(FileSystemEventHandler):
-    """Watches transcripts/ for new JSON files, runs analysis."""
-
-    def on_created(self, event):
-        if event.is_directory:
-            return
-        path = Path(event.src_path)
-        if path.suffix != '.json' or path.name.endswith('.analysis.json'):
-            return
-        print(f"\n  New transcript: {path.name}")
-        # Small delay to ensure file is fully written
-        time.sleep(0.5)
-        run_analysis(path)
+        pending, self._pending = self._pending, set()
 
-    def on_modified(self, event):
-        if event.is_directory:
-            return
-        path = Path(event.src_path)
-        if path.suffix != '.json' or path.name.endswith('.analysis.json'):
-            return
-        # Only analyze on modify if no companion analysis exists yet
-        analysis_path = path.with_suffix('.analysis.json')
-        if not analysis_path.exists():
-            print(f"\n  Updated transcript: {path.name}")
-            time.sleep(0.5)
-            run_analysis(path)
+        # Edited test files: run just those. Anything else (source, conftest):
+        # rerun last failures first, or the whole suite if nothing failed.
+        test_files = sorted(
+            str(p.relative_to(PROJECT_ROOT)) for p in pending
+            if TESTS_DIR in p.parents and p.name.startswith("test_")
+        )
+        if test_files:
+            full_run = False
+            success, count = run_tests(self.include_live, targets=test_files)
+        else:
+            full_run = not _has_last_failed()
+            success, count = run_tests(self.include_live, last_failed=True, parallel=self.parallel)
+
+        # Only a full run gives the suite-wide count the docs record
+        if success and count and full_run and self.update_docs:
+            update_doc_counts(count)
 
 
 # ---------------------------------------------------------------------------
@@ -188,6 +508,8 @@ def main():
     parser.add_argument("--live", action="store_true", help="Include live API tests in pytest runs")
     parser.add_argument("--no-docs", action="store_true", help="Skip doc count updates")
     parser.add_argument("--no-analysis", action="store_true", help="Skip transcript analysis")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Run full-suite runs across cores with pytest-xdist, if installed")
     args = parser.parse_args()
 
     update_docs = not args.no_docs
@@ -197,26 +519,29 @@ def main():
     print(f"  Live tests: {'yes' if args.live else 'no'}")
     print(f"  Doc updates: {'yes' if update_docs else 'no'}")
     print(f"  Transcript analysis: {'yes' if run_analysis_flag else 'no'}")
+    print(f"  Parallel full runs: {'yes' if args.parallel and _XDIST_ARGS else 'no'}")
     print()
 
     # Initial test run for baseline
     print("Running initial test suite...")
-    success, count = run_tests(args.live)
+    success, count = run_tests(args.live, parallel=args.parallel)
     if success and count and update_docs:
         update_doc_counts(count)
 
+    from watchdog.observers import Observer
+
     # Set up watchers
     observer = Observer()
 
     # Watch code files
-    code_handler = CodeChangeHandler(include_live=args.live, update_docs=update_docs)
+    code_handler = CodeChangeHandler(include_live=args.live, update_docs=update_docs, parallel=args.parallel)
     observer.schedule(code_handler, str(PROJECT_ROOT), recursive=True)
 
     # Watch transcripts
     if run_analysis_flag:
         TRANSCRIPTS_DIR.mkdir(exist_ok=True)
-        transcript_handler = TranscriptHandler()
-        observer.schedule(transcript_handler, str(TRANSCRIPTS_DIR), recursive=False)
+        _start_analysis_loop()
+        Thread(target=_watch_transcripts, daemon=True).start()
 
     observer.start()
     print(f"\nWatching for changes... (Ctrl+C to stop)")
@@ -228,6 +553,8 @@ def main():
         print("\nStopping watcher...")
         observer.stop()
     observer.join()
+    _stop_analysis_loop()
+    _daemon.close()
 
 
 if __name__ == "__main__":
@@ -6,10 +6,14 @@ produces a ranked ComparisonResult with recommendation.
 """
 
 import asyncio
-import json
+import hashlib
+import io
 import logging
 import os
+import time
+from pathlib import Path
 
+import orjson
 from anthropic import Anthropic
 
 from .schemas import CallResult, ComparisonResult
@@ -18,16 +22,27 @@ logger = logging.getLogger("pipeline.analysis")
 
 CLAUDE_MODEL = os.environ.get("CLAUDE_MODEL", "claude-haiku-4-5-20251001")
 
+# Parsed comparison responses, keyed by a hash of model + prompt. Entries
+# older than _CACHE_TTL seconds are ignored; COMPARISON_CACHE=0 bypasses them.
+_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "comparisons"
+_CACHE_TTL = 24 * 60 * 60
+
+_CLIENT: Anthropic | None = None
+
 
 async def compare_stores(
     call_results: list[CallResult],
     product_description: str,
+    use_cache: bool = True,
 ) -> ComparisonResult:
     """Compare quotes from multiple stores and recommend the best option.
 
     Args:
         call_results: List of CallResult from completed store calls.
         product_description: What the user is buying.
+        use_cache: Reuse a stored comparison for the same prompt. When False
+            (or COMPARISON_CACHE=0), the LLM is always called and its result
+            replaces any stored one.
 
     Returns:
         ComparisonResult with ranking and recommendation.
@@ -37,26 +52,34 @@ async def compare_stores(
             summary="No store calls were completed.",
         )
 
-    # Build context for LLM — include actual conversation transcripts
-    stores_context = []
-    for r in call_results:
+    # Build context for LLM — include actual conversation transcripts.
+    # Each store is serialized straight into the buffer, compactly: the model
+    # doesn't need indentation and it only adds tokens.
+    stores_context = io.StringIO()
+    stores_context.write("[")
+    for i, r in enumerate(call_results):
+        if i:
+            stores_context.write(",\n")
         transcript = r.extracted_data.get("transcript", [])
-        conversation = _format_transcript(transcript)
-        stores_context.append({
+        # orjson output is compact and leaves Hindi text unescaped. The
+        # conversation goes last so it can be written in without the dict
+        stores_context.write(orjson.dumps({
             "store_name": r.store.name,
             "area": r.store.area,
-            "conversation": conversation,
             "topics_covered": r.topics_covered,
             "quality_score": r.quality_score,
-        })
+        }).decode()[:-1])
+        stores_context.write(',"conversation":')
+        _write_transcript(stores_context, transcript)
+        stores_context.write("}")
+    stores_context.write("]")
 
     single = len(call_results) == 1
-    client = Anthropic()
 
     prompt = f"""{"Analyze this store call" if single else "Compare these store calls"} for "{product_description}".
 
 {"Store call:" if single else "Store calls:"}
-{json.dumps(stores_context, indent=2, ensure_ascii=False)}
+{stores_context.getvalue()}
 
 Extract from each conversation:
 1. Price quoted (exact number from shopkeeper)
@@ -87,29 +110,41 @@ Output your analysis as JSON:
 
 Output ONLY the JSON, nothing else."""
 
-    response = await asyncio.to_thread(
-        client.messages.create,
-        model=CLAUDE_MODEL,
-        max_tokens=1024,
-        messages=[{"role": "user", "content": prompt}],
-    )
+    # The prompt captures every input, so identical calls (retries, re-runs)
+    # reuse the stored comparison instead of paying for another API call
+    use_cache = use_cache and os.environ.get("COMPARISON_CACHE", "1") != "0"
+    cache_path = _CACHE_DIR / f"{_cache_key(CLAUDE_MODEL, prompt)}.json"
+    data = _read_cache(cache_path) if use_cache else None
+    if data is None:
+        response = await asyncio.to_thread(
+            _client().messages.create,
+            model=CLAUDE_MODEL,
+            max_tokens=1024,
+            messages=[{"role": "user", "content": prompt}],
+        )
 
-    text = response.content[0].text.strip()
+        text = response.content[0].text.strip()
 
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        import re
-        match = re.search(r"\{.*\}", text, re.DOTALL)
-        if match:
-            try:
-                data = json.loads(match.group())
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse comparison JSON")
+        try:
+            data = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            obj = _extract_json_object(text)
+            if obj:
+                try:
+                    data = orjson.loads(obj)
+                except orjson.JSONDecodeError:
+                    logger.warning("Failed to parse comparison JSON")
+                    return _fallback_comparison(call_results)
+            else:
+                logger.warning("No JSON found in comparison response")
                 return _fallback_comparison(call_results)
-        else:
-            logger.warning("No JSON found in comparison response")
+
+        if not isinstance(data, dict):
+            logger.warning("Comparison JSON is not an object")
             return _fallback_comparison(call_results)
+        # Only complete comparisons are kept, so a bad answer isn't replayed
+        if data.get("ranking"):
+            _write_cache(cache_path, data)
 
     return ComparisonResult(
         recommended_store=data.get("recommended_store", ""),
@@ -119,15 +154,95 @@ Output ONLY the JSON, nothing else."""
     )
 
 
-def _format_transcript(messages: list[dict]) -> str:
-    """Format transcript messages into readable conversation text."""
-    lines = []
+def _client() -> Anthropic:
+    """Shared client, so repeated comparisons reuse its pooled connections."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = Anthropic()
+    return _CLIENT
+
+
+def _extract_json_object(text: str) -> str | None:
+    """Return the first balanced {...} in text (e.g. JSON wrapped in prose).
+
+    Single linear scan that tracks string literals, so braces inside quoted
+    values don't affect nesting.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_str = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _cache_key(model: str, prompt: str) -> str:
+    """Content hash of the model + prompt, used as the cache filename."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model.encode())
+    h.update(b"\0")
+    h.update(prompt.encode())
+    return h.hexdigest()
+
+
+def _read_cache(path: Path) -> dict | None:
+    """Return a cached comparison, or None on a miss, expired or unreadable entry."""
+    try:
+        if time.time() - path.stat().st_mtime > _CACHE_TTL:
+            return None
+        data = orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_cache(path: Path, data: dict):
+    """Store a comparison atomically (tmp file + rename). Failures are non-fatal."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(orjson.dumps(data))
+        os.replace(tmp, path)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Failed to cache comparison: {e}")
+
+
+def _write_transcript(buf: io.StringIO, messages: list[dict]):
+    """Write transcript messages into buf as one JSON string of conversation text.
+
+    Lines are JSON-escaped one at a time and written straight into buf, so
+    the whole conversation is never joined into a separate string first.
+    """
+    buf.write('"')
+    sep = ""
     for m in messages:
         role = "Agent" if m.get("role") == "assistant" else "Shopkeeper"
         text = m.get("text", "")
         if text:
-            lines.append(f"{role}: {text}")
-    return "\n".join(lines) if lines else "(no conversation recorded)"
+            buf.write(sep)
+            # Escaping is per character, so escaped lines join like raw ones
+            buf.write(orjson.dumps(f"{role}: {text}").decode()[1:-1])
+            sep = "\\n"
+    if not sep:
+        buf.write("(no conversation recorded)")
+    buf.write('"')
 
 
 def _fallback_comparison(call_results: list[CallResult]) -> ComparisonResult:
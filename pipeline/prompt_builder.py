@@ -6,7 +6,10 @@ output, store info, and product requirements. No LLM call — pure string
 templating with the same structure as DEFAULT_INSTRUCTIONS in agent_worker.py.
 """
 
+import functools
+import io
 import re
+from itertools import islice
 
 from .schemas import ProductRequirements, ResearchOutput, DiscoveredStore
 
@@ -17,8 +20,27 @@ _SIZE_ADJECTIVES = re.compile(
     re.IGNORECASE,
 )
 
+# Spec/qualifier patterns stripped by _casual_product_name
+_PAREN_RE = re.compile(r"\s*\([^)]*\)")
+_WITH_RE = re.compile(r"\s+with\s+.*", re.IGNORECASE)
+_SIZE_RANGE_RE = re.compile(r"\d[\d.,]*\s*-\s*\d[\d.,]*\s*(L|litre|litres|kg|ton|inch)\b", re.IGNORECASE)
+_SIZE_RE = re.compile(r"\d[\d.,]*\s*(L|litre|litres|kg|ton|inch)\b", re.IGNORECASE)
+_TECH_QUALIFIER_RE = re.compile(r"\b(manual\s+defrost|frost[- ]?free|inverter|direct\s+cool)\b", re.IGNORECASE)
+_EDGE_PUNCT_RE = re.compile(r"^[\s,\-]+|[\s,\-]+$")
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+# Cheap substring checks that gate the regexes above — most names are
+# already casual ("AC", "washing machine") and need none of them
+_SIZE_ADJECTIVE_PREFIXES = ("small", "medium", "large", "big", "compact", "mini", "full")
+_TECH_QUALIFIER_WORDS = ("manual", "frost", "inverter", "direct")
+
 
 def _casual_product_name(requirements: ProductRequirements) -> str:
+    """Casual spoken name for the product — see _casual_from_strings."""
+    return _casual_from_strings(requirements.category or "", requirements.product_type)
+
+
+@functools.lru_cache(maxsize=256)
+def _casual_from_strings(category: str, product_type: str) -> str:
     """Strip verbose specs from category for natural spoken use.
 
     "Medium double door fridge with separate freezer section (220-280L)"
@@ -28,23 +50,31 @@ def _casual_product_name(requirements: ProductRequirements) -> str:
 
     Falls back to product_type if the result is too short (<3 chars).
     """
-    name = requirements.category or requirements.product_type
+    name = category or product_type
     # Strip parenthetical specs like (220-280L), (1.5 ton), etc.
-    name = re.sub(r"\s*\([^)]*\)", "", name)
+    if "(" in name:
+        name = _PAREN_RE.sub("", name)
+    lower = name.lower()
     # Strip "with ..." clauses
-    name = re.sub(r"\s+with\s+.*", "", name, flags=re.IGNORECASE)
+    if "with" in lower:
+        name = _WITH_RE.sub("", name)
     # Strip inline capacity/size specs: "250-300L", "450L", "1.5 ton", "7kg", "55 inch"
-    name = re.sub(r"\d[\d.,]*\s*-\s*\d[\d.,]*\s*(L|litre|litres|kg|ton|inch)\b", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"\d[\d.,]*\s*(L|litre|litres|kg|ton|inch)\b", "", name, flags=re.IGNORECASE)
+    if any(map(str.isdecimal, name)):
+        name = _SIZE_RANGE_RE.sub("", name)
+        name = _SIZE_RE.sub("", name)
     # Strip "manual defrost", "frost-free", "inverter" and similar tech qualifiers
-    name = re.sub(r"\b(manual\s+defrost|frost[- ]?free|inverter|direct\s+cool)\b", "", name, flags=re.IGNORECASE)
+    lower = name.lower()
+    if any(word in lower for word in _TECH_QUALIFIER_WORDS):
+        name = _TECH_QUALIFIER_RE.sub("", name)
+        lower = name.lower()
     # Strip leading size adjectives
-    name = _SIZE_ADJECTIVES.sub("", name)
+    if lower.startswith(_SIZE_ADJECTIVE_PREFIXES):
+        name = _SIZE_ADJECTIVES.sub("", name)
     # Strip leading/trailing commas, spaces, hyphens left over
-    name = re.sub(r"^[\s,\-]+|[\s,\-]+$", "", name)
-    name = re.sub(r"\s{2,}", " ", name).strip()
+    name = _EDGE_PUNCT_RE.sub("", name)
+    name = _MULTI_SPACE_RE.sub(" ", name).strip()
     if len(name) < 3:
-        name = requirements.product_type
+        name = product_type
     return name
 
 
@@ -83,78 +113,23 @@ def build_greeting(requirements: ProductRequirements, store: DiscoveredStore) ->
     Returns something like:
         "Hello, yeh Croma hai? double door fridge ke baare mein poochna tha."
     """
-    casual = _casual_product_name(requirements)
-    return f"Hello, yeh {store.name} hai? {casual} ke baare mein poochna tha."
-
-
-def build_prompt(
-    requirements: ProductRequirements,
-    research: ResearchOutput,
-    store: DiscoveredStore,
-) -> str:
-    """Build a complete voice agent prompt for a specific store call.
-
-    Args:
-        requirements: What the user wants to buy.
-        research: Product research findings.
-        store: The specific store being called.
-
-    Returns:
-        Complete system prompt string for the voice agent.
-    """
-    casual = _casual_product_name(requirements)
-    store_type = _infer_store_type(requirements.product_type)
+    return _greeting_text(store.name, _casual_product_name(requirements))
 
-    # Build the "WHAT YOU CARE ABOUT" section from research questions
-    care_about_lines = []
-    for q in research.questions_to_ask[:10]:
-        care_about_lines.append(f"- {q}")
-    care_about = "\n".join(care_about_lines) if care_about_lines else _default_care_about()
 
-    # Build topics for conversation flow
-    topics = research.topics_to_cover[:10] if research.topics_to_cover else [
-        "price", "warranty", "installation", "delivery"
-    ]
-    topic_flow = " → ".join(topics)
+def _greeting_text(store_name: str, casual: str) -> str:
+    return f"Hello, yeh {store_name} hai? {casual} ke baare mein poochna tha."
 
-    # Build "WHAT YOU DON'T CARE ABOUT" based on product type
-    dont_care = _infer_dont_care(requirements.product_type)
 
-    # Determine minimum info needed before ending call
-    min_topics = min(len(topics) - 1, 3)
-    min_topics = max(min_topics, 2)
-
-    # Build examples section
-    examples = _build_examples(requirements, research)
-
-    # Area info
-    area = store.nearby_area or store.area or requirements.location.split(",")[0].strip()
-    area_line = f'\nYOUR AREA: {area} — if asked where you live, say "{area} mein rehta hoon" or "{area} side".' if area else ""
-
-    # Exchange item suggestion
-    exchange_suggestion = _infer_exchange_item(requirements.product_type)
-
-    # Price range note
-    price_note = ""
-    if research.market_price_range:
-        low, high = research.market_price_range
-        price_note = f"\nExpected market price range: {low}-{high} rupees. Use this to gauge if the shopkeeper's price is reasonable."
-
-    # Greeting note — tells LLM not to repeat the greeting
-    greeting = build_greeting(requirements, store)
-    greeting_note = (
-        f'\nNOTE: You have already greeted the shopkeeper with: "{greeting}"'
-        f'\nDo NOT repeat the greeting. Continue the conversation from the shopkeeper\'s response.'
-    )
-
-    # Build conditional research sections
-    research_sections = _build_research_sections(research)
-
-    # Build dynamic conversation flow and negotiation
-    conversation_flow = _build_conversation_flow(requirements, store, casual, topics, min_topics)
-    negotiation = _build_negotiation_section(research)
+# Used when research didn't produce questions / topics
+_DEFAULT_CARE_ABOUT = """- Price — "Best price kya doge?" / "Final kitna lagega?"
+- Installation — "Installation free hai ya alag se?"
+- Warranty — "Warranty kitni hai?"
+- Delivery — "Delivery kitne din mein hogi?"
+- Availability — "Stock mein hai?" """
+_DEFAULT_TOPICS = ("price", "warranty", "installation", "delivery")
 
-    prompt = f"""You are a regular middle-class Indian guy calling a local {store_type} to ask about {casual}. You speak the way a normal person speaks on the phone in Hindi — casual, natural, with filler words.
+# Static body of the voice agent prompt; build_prompt fills the placeholders
+_PROMPT_TEMPLATE = """You are a regular middle-class Indian guy calling a local {store_type} to ask about {casual}. You speak the way a normal person speaks on the phone in Hindi — casual, natural, with filler words.
 
 VOICE & TONE:
 - Speak in natural spoken Hindi/Hinglish. NOT formal Hindi, NOT written Hindi.
@@ -180,7 +155,7 @@ INTERRUPTIONS:
 - Continue the conversation naturally from the interruption point.
 
 ENDING THE CALL:
-- Do NOT call end_call until you have the PRICE plus at least {min_topics} of: {', '.join(topics[1:])}.
+- Do NOT call end_call until you have the PRICE plus at least {min_topics} of: {topics_after_first}.
 - If the shopkeeper says something unclear or off-topic, stay on the line and redirect to {casual} prices.
 - If the shopkeeper says "wait" or "hold on", just say "ji ji, no problem" and wait.
 - When you have enough info, say a SHORT goodbye like "Theek hai ji, bahut badiya. Dhanyavaad, namaste." and IMMEDIATELY call end_call.
@@ -230,67 +205,206 @@ CRITICAL OUTPUT RULES:
 {examples}
 
 PRODUCT: {casual}
-STORE: {store.name}{area_line}{price_note}{greeting_note}
+STORE: {store_name}{area_line}{price_note}{greeting_note}
 """
 
-    return prompt
 
+def build_prompt(
+    requirements: ProductRequirements,
+    research: ResearchOutput,
+    store: DiscoveredStore,
+    *,
+    include_greeting_note: bool = True,
+) -> str:
+    """Build a complete voice agent prompt for a specific store call.
 
-def _infer_store_type(product_type: str) -> str:
-    """Infer the type of store based on product."""
-    pt = product_type.lower()
-    if any(w in pt for w in ["ac", "fridge", "refrigerator", "washing machine", "tv", "television"]):
-        return "electronics/appliance shop"
-    if any(w in pt for w in ["laptop", "computer", "desktop"]):
-        return "computer shop"
-    if any(w in pt for w in ["phone", "mobile", "smartphone"]):
-        return "mobile shop"
-    if any(w in pt for w in ["furniture", "sofa", "table", "bed"]):
-        return "furniture shop"
-    return "shop"
+    Args:
+        requirements: What the user wants to buy.
+        research: Product research findings.
+        store: The specific store being called.
+        include_greeting_note: Tell the LLM which greeting was already spoken.
+            Pass False when no greeting goes out before the conversation.
 
+    Returns:
+        Complete system prompt string for the voice agent.
+    """
+    casual = _casual_product_name(requirements)
+    pt_lc = requirements.product_type.lower()
+    store_type = _infer_store_type_lc(pt_lc)
 
-def _default_care_about() -> str:
-    return """- Price — "Best price kya doge?" / "Final kitna lagega?"
-- Installation — "Installation free hai ya alag se?"
-- Warranty — "Warranty kitni hai?"
-- Delivery — "Delivery kitne din mein hogi?"
-- Availability — "Stock mein hai?" """
+    # Build the "WHAT YOU CARE ABOUT" section from research questions
+    care_about = "\n".join(f"- {q}" for q in islice(research.questions_to_ask, 10)) or _DEFAULT_CARE_ABOUT
 
+    # Build topics for conversation flow
+    topics = tuple(islice(research.topics_to_cover, 10)) or _DEFAULT_TOPICS
+    first, *rest = topics
+    topics_after_first = ", ".join(rest)
+    topic_flow = f"{first} → {' → '.join(rest)}" if rest else first
 
-def _infer_dont_care(product_type: str) -> str:
-    """Infer what topics to skip based on product type."""
-    pt = product_type.lower()
-    if "ac" in pt:
-        return """- Technical specs (copper vs aluminium, cooling capacity, inverter details)
+    # Build "WHAT YOU DON'T CARE ABOUT" based on product type
+    dont_care = _infer_dont_care_lc(pt_lc)
+
+    # Determine minimum info needed before ending call
+    min_topics = min(len(topics) - 1, 3)
+    min_topics = max(min_topics, 2)
+
+    # Build examples section
+    examples = _build_examples(casual, research)
+
+    # Area info
+    area = store.nearby_area or store.area or requirements.location.split(",")[0].strip()
+    area_line = f'\nYOUR AREA: {area} — if asked where you live, say "{area} mein rehta hoon" or "{area} side".' if area else ""
+
+    # Exchange item suggestion
+    exchange_suggestion = _infer_exchange_item_lc(pt_lc)
+
+    # Price range note
+    price_note = ""
+    if research.market_price_range:
+        low, high = research.market_price_range
+        price_note = f"\nExpected market price range: {low}-{high} rupees. Use this to gauge if the shopkeeper's price is reasonable."
+
+    # Greeting note — tells LLM not to repeat the greeting
+    greeting_note = ""
+    if include_greeting_note:
+        greeting = _greeting_text(store.name, casual)
+        greeting_note = (
+            f'\nNOTE: You have already greeted the shopkeeper with: "{greeting}"'
+            f'\nDo NOT repeat the greeting. Continue the conversation from the shopkeeper\'s response.'
+        )
+
+    # Build conditional research sections
+    research_sections = _build_research_sections(research)
+
+    # Build dynamic conversation flow and negotiation
+    conversation_flow = _build_conversation_flow(pt_lc, store, casual, topic_flow, min_topics)
+    negotiation = _build_negotiation_section(research)
+
+    return _PROMPT_TEMPLATE.format_map({
+        "store_type": store_type,
+        "casual": casual,
+        "care_about": care_about,
+        "dont_care": dont_care,
+        "conversation_flow": conversation_flow,
+        "negotiation": negotiation,
+        "research_sections": research_sections,
+        "min_topics": min_topics,
+        "topics_after_first": topics_after_first,
+        "exchange_suggestion": exchange_suggestion,
+        "examples": examples,
+        "store_name": store.name,
+        "area_line": area_line,
+        "price_note": price_note,
+        "greeting_note": greeting_note,
+    })
+
+
+def _keyword_table(*groups: tuple[tuple[str, ...], str]):
+    """Compile ordered (keywords, value) groups into a one-pass classifier.
+
+    Keywords match as substrings, and when several are present the earliest
+    group wins — the same result as checking each group in turn with `in`.
+    The lookahead makes matches zero-width so overlapping keywords are all
+    seen; each keyword carries the best rank of any keyword it starts with.
+    """
+    ranked = {}
+    for rank, (keywords, value) in enumerate(groups):
+        for kw in keywords:
+            ranked.setdefault(kw, (rank, value))
+    ranks = {
+        kw: min(hit for other, hit in ranked.items() if kw.startswith(other))
+        for kw in ranked
+    }
+    alternation = "|".join(map(re.escape, sorted(ranks, key=len, reverse=True)))
+    return re.compile(f"(?=({alternation}))"), ranks
+
+
+def _classify(table, pt: str, default: str) -> str:
+    """Value of the highest-priority keyword group found in pt, else default."""
+    pattern, ranks = table
+    best = min((ranks[m.group(1)] for m in pattern.finditer(pt)), default=None)
+    return best[1] if best else default
+
+
+_STORE_TYPES = _keyword_table(
+    (("ac", "fridge", "refrigerator", "washing machine", "tv", "television"), "electronics/appliance shop"),
+    (("laptop", "computer", "desktop"), "computer shop"),
+    (("phone", "mobile", "smartphone"), "mobile shop"),
+    (("furniture", "sofa", "table", "bed"), "furniture shop"),
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _infer_store_type_lc(pt: str) -> str:
+    """Infer the type of store from the lowercased product type."""
+    return _classify(_STORE_TYPES, pt, "shop")
+
+
+_DONT_CARE_AC = """- Technical specs (copper vs aluminium, cooling capacity, inverter details)
 - Wi-Fi, smart features, brand comparisons, energy rating details"""
-    if any(w in pt for w in ["washing machine"]):
-        return """- Technical specs (RPM details, motor type, drum material)
+_DONT_CARE_WASHING = """- Technical specs (RPM details, motor type, drum material)
 - Smart features, Wi-Fi connectivity, app control details"""
-    if any(w in pt for w in ["laptop", "computer"]):
-        return """- Benchmark scores, technical comparisons
+_DONT_CARE_COMPUTER = """- Benchmark scores, technical comparisons
 - Extended spec discussions (exact RAM speed, SSD type details)"""
-    if any(w in pt for w in ["phone", "mobile"]):
-        return """- Detailed camera sensor specs, benchmark scores
+_DONT_CARE_PHONE = """- Detailed camera sensor specs, benchmark scores
 - Chipset technical details, band support specifics"""
-    return """- Overly technical specifications
+_DONT_CARE_DEFAULT = """- Overly technical specifications
 - Feature comparisons that don't affect the buying decision"""
 
+_DONT_CARE = _keyword_table(
+    (("ac",), _DONT_CARE_AC),
+    (("washing machine",), _DONT_CARE_WASHING),
+    (("laptop", "computer"), _DONT_CARE_COMPUTER),
+    (("phone", "mobile"), _DONT_CARE_PHONE),
+)
 
-def _infer_exchange_item(product_type: str) -> str:
-    """Suggest what to say if asked about exchange."""
-    pt = product_type.lower()
-    if "ac" in pt:
-        return 'If asked about your old AC for exchange, say "Voltas ka hai, kaafi purana ho gaya hai" or "LG ka window AC hai purana". Pick ONE brand and stick with it.'
-    if "washing machine" in pt:
-        return 'If asked about your old washing machine for exchange, say "Purana semi-automatic hai, kaam nahi kar raha" or "LG ka hai, bahut purana ho gaya". Pick ONE and stick with it.'
-    if any(w in pt for w in ["fridge", "refrigerator"]):
-        return 'If asked about your old fridge for exchange, say "Godrej ka hai, kaafi purana" or "LG ka single door hai". Pick ONE and stick with it.'
-    if any(w in pt for w in ["laptop", "computer"]):
-        return 'If asked about your old laptop for exchange, say "HP ka hai, 4-5 saal purana" or "Dell ka hai, bahut slow ho gaya". Pick ONE and stick with it.'
-    if any(w in pt for w in ["phone", "mobile"]):
-        return 'If asked about your old phone for exchange, say "Samsung ka hai, 2-3 saal purana" or "Redmi ka hai, screen toot gayi". Pick ONE and stick with it.'
-    return 'If asked about exchange, say you have an old one of the same product type. Keep it vague but natural.'
+
+@functools.lru_cache(maxsize=256)
+def _infer_dont_care_lc(pt: str) -> str:
+    """Infer what topics to skip from the lowercased product type."""
+    return _classify(_DONT_CARE, pt, _DONT_CARE_DEFAULT)
+
+
+_EXCHANGE_ITEMS = _keyword_table(
+    (("ac",), 'If asked about your old AC for exchange, say "Voltas ka hai, kaafi purana ho gaya hai" or "LG ka window AC hai purana". Pick ONE brand and stick with it.'),
+    (("washing machine",), 'If asked about your old washing machine for exchange, say "Purana semi-automatic hai, kaam nahi kar raha" or "LG ka hai, bahut purana ho gaya". Pick ONE and stick with it.'),
+    (("fridge", "refrigerator"), 'If asked about your old fridge for exchange, say "Godrej ka hai, kaafi purana" or "LG ka single door hai". Pick ONE and stick with it.'),
+    (("laptop", "computer"), 'If asked about your old laptop for exchange, say "HP ka hai, 4-5 saal purana" or "Dell ka hai, bahut slow ho gaya". Pick ONE and stick with it.'),
+    (("phone", "mobile"), 'If asked about your old phone for exchange, say "Samsung ka hai, 2-3 saal purana" or "Redmi ka hai, screen toot gayi". Pick ONE and stick with it.'),
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _infer_exchange_item_lc(pt: str) -> str:
+    """Suggest what to say if asked about exchange, given the lowercased product type."""
+    return _classify(
+        _EXCHANGE_ITEMS, pt,
+        'If asked about exchange, say you have an old one of the same product type. Keep it vague but natural.',
+    )
+
+
+def _write_section(buf: io.StringIO, title: str, body: str, footer: str = "") -> None:
+    """Append a "TITLE:\nbody[footer]" section, blank-line separated from the last."""
+    if buf.tell():
+        buf.write("\n\n")
+    buf.write(title)
+    buf.write(":\n")
+    buf.write(body)
+    buf.write(footer)
+
+
+# negotiation_intelligence keys shown in NEGOTIATION INTELLIGENCE, in order
+_NEGOTIATION_LABELS = (
+    ("typical_margin", "- Dealer margin: "),
+    ("seasonal_notes", "- Seasonal: "),
+    ("bundle_tricks", "- Watch out: "),
+    ("online_reference", "- Online price: "),
+)
+
+
+def _text(value) -> str:
+    """Field value as prompt text; falsy values (None, "", []) become ""."""
+    return str(value) if value else ""
 
 
 def _build_research_sections(research: ResearchOutput) -> str:
@@ -298,86 +412,107 @@ def _build_research_sections(research: ResearchOutput) -> str:
     INSIDER KNOWLEDGE, BUYER NOTES, and WHEN STUCK sections.
 
     All sections are conditional — empty research data = section omitted.
+    The fields used are reduced to hashable strings/tuples so that the text
+    is assembled once per distinct research result, not once per store.
     """
-    parts = []
+    competing = tuple(
+        (_extract_brand(cp.get("name", "")), _text(cp.get("price_range")), _text(cp.get("pros")))
+        for cp in islice(research.competing_products, 5)
+    )
+    recommended = tuple(
+        (_extract_brand(rp.get("model", "")), _text(rp.get("street_price")))
+        for rp in islice(research.recommended_products, 3)
+    )
+    ni = research.negotiation_intelligence or {}
+    negotiation = tuple(_text(ni.get(key)) for key, _ in _NEGOTIATION_LABELS)
+
+    first_brand = ""
+    if research.recommended_products:
+        first_brand = _extract_brand(research.recommended_products[0].get("model", ""))
+    if not first_brand and research.competing_products:
+        first_brand = _extract_brand(research.competing_products[0].get("name", ""))
+
+    return _research_sections_text(
+        _text(research.product_summary),
+        competing,
+        recommended,
+        negotiation,
+        tuple(map(str, islice(research.insider_knowledge, 3))),
+        tuple(map(str, islice(research.important_notes, 6))),
+        research.market_price_range[0] if research.market_price_range else None,
+        first_brand,
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _research_sections_text(
+    product_summary: str,
+    competing: tuple[tuple[str, str, str], ...],
+    recommended: tuple[tuple[str, str], ...],
+    negotiation: tuple[str, ...],
+    insider: tuple[str, ...],
+    notes: tuple[str, ...],
+    low_price,
+    first_brand: str,
+) -> str:
+    """Assemble the research sections from already-extracted fields."""
+    buf = io.StringIO()
 
     # PRODUCT KNOWLEDGE — summary + top competing products (brand only, no model codes)
     knowledge_lines = []
-    if research.product_summary:
-        knowledge_lines.append(_tts_safe(research.product_summary))
-    for cp in research.competing_products[:5]:
-        name = cp.get("name", "")
-        price_range = cp.get("price_range", "")
-        pros = cp.get("pros", "")
-        brand = _extract_brand(name)
+    if product_summary:
+        knowledge_lines.append(_tts_safe(product_summary))
+    for brand, price_range, pros in competing:
         if brand:
-            line = f"- {brand}"
-            if price_range:
-                line += f" ({_tts_safe(price_range)})"
-            if pros:
-                line += f" — {pros}"
-            knowledge_lines.append(line)
+            knowledge_lines.append("".join((
+                "- ", brand,
+                f" ({_tts_safe(price_range)})" if price_range else "",
+                f" — {pros}" if pros else "",
+            )))
     if knowledge_lines:
-        parts.append("PRODUCT KNOWLEDGE:\n" + "\n".join(knowledge_lines)
-                      + '\nIf shopkeeper asks "which model?", just say the brand name like "LG ka double door dikhao".')
+        _write_section(
+            buf, "PRODUCT KNOWLEDGE", "\n".join(knowledge_lines),
+            '\nIf shopkeeper asks "which model?", just say the brand name like "LG ka double door dikhao".',
+        )
 
     # RECOMMENDED PRODUCTS — top picks (brand + price only, no model codes)
-    if research.recommended_products:
-        rec_lines = []
-        for rp in research.recommended_products[:3]:
-            model = rp.get("model", "")
-            street_price = rp.get("street_price", "")
-            brand = _extract_brand(model)
-            if brand:
-                line = f"- {brand}"
-                if street_price:
-                    line += f" (~{street_price} online)"
-                rec_lines.append(line)
-        if rec_lines:
-            parts.append(
-                "RECOMMENDED PRODUCTS:\n" + "\n".join(rec_lines)
-                + '\nCasually mention these if relevant: "Maine online dekha tha [brand] ka price..."'
-            )
+    rec_body = "\n".join(
+        f"- {brand} (~{street_price} online)" if street_price else "- " + brand
+        for brand, street_price in recommended
+        if brand
+    )
+    if rec_body:
+        _write_section(
+            buf, "RECOMMENDED PRODUCTS", rec_body,
+            '\nCasually mention these if relevant: "Maine online dekha tha [brand] ka price..."',
+        )
 
     # NEGOTIATION INTELLIGENCE — margins, seasonal info, tactics
-    if research.negotiation_intelligence:
-        ni = research.negotiation_intelligence
-        neg_lines = []
-        if ni.get("typical_margin"):
-            neg_lines.append(f"- Dealer margin: {ni['typical_margin']}")
-        if ni.get("seasonal_notes"):
-            neg_lines.append(f"- Seasonal: {ni['seasonal_notes']}")
-        if ni.get("bundle_tricks"):
-            neg_lines.append(f"- Watch out: {ni['bundle_tricks']}")
-        if ni.get("online_reference"):
-            neg_lines.append(f"- Online price: {ni['online_reference']}")
-        if neg_lines:
-            parts.append(
-                "NEGOTIATION INTELLIGENCE:\n" + "\n".join(neg_lines)
-                + "\nUse these naturally — don't dump all at once. Drop one fact at a time when negotiating."
-            )
+    neg_body = "\n".join(
+        label + value
+        for (_, label), value in zip(_NEGOTIATION_LABELS, negotiation)
+        if value
+    )
+    if neg_body:
+        _write_section(
+            buf, "NEGOTIATION INTELLIGENCE", neg_body,
+            "\nUse these naturally — don't dump all at once. Drop one fact at a time when negotiating.",
+        )
 
     # INSIDER KNOWLEDGE — known issues, recalls, market tips
-    if research.insider_knowledge:
-        ik_lines = [f"- {tip}" for tip in research.insider_knowledge[:3]]
-        parts.append(
-            "INSIDER KNOWLEDGE:\n" + "\n".join(ik_lines)
-            + "\nUse strategically — mention only if it helps get a better deal."
+    if insider:
+        _write_section(
+            buf, "INSIDER KNOWLEDGE",
+            "\n".join("- " + tip for tip in insider),
+            "\nUse strategically — mention only if it helps get a better deal.",
         )
 
     # BUYER NOTES — important_notes from research
-    if research.important_notes:
-        notes = research.important_notes[:6]
-        note_lines = [f"- {n}" for n in notes]
-        parts.append("BUYER NOTES:\n" + "\n".join(note_lines))
+    if notes:
+        _write_section(buf, "BUYER NOTES", "\n".join("- " + n for n in notes))
 
     # WHEN STUCK — strategies for conversation recovery
-    first_brand = ""
-    if research.recommended_products:
-        first_brand = _extract_brand(research.recommended_products[0].get("model", ""))
-    if not first_brand and research.competing_products:
-        first_brand = _extract_brand(research.competing_products[0].get("name", ""))
-    if first_brand or research.product_summary:
+    if first_brand or product_summary:
         stuck_lines = []
         if first_brand:
             stuck_lines.append(
@@ -386,31 +521,32 @@ def _build_research_sections(research: ResearchOutput) -> str:
         stuck_lines.append(
             '- If you fail to get an answer after 2 attempts, say "Achha theek hai" and move to the next topic.'
         )
-        if research.market_price_range:
-            low = research.market_price_range[0]
+        if low_price is not None:
             stuck_lines.append(
-                f'- If asked about budget, anchor low: "{low} ke aas paas soch rahe the"'
+                f'- If asked about budget, anchor low: "{low_price} ke aas paas soch rahe the"'
             )
-        parts.append("WHEN STUCK:\n" + "\n".join(stuck_lines))
+        _write_section(buf, "WHEN STUCK", "\n".join(stuck_lines))
 
-    if not parts:
+    if not buf.tell():
         return ""
-    return "\n" + "\n\n".join(parts) + "\n"
+    # Pad here rather than in the template, which must stay blank-line
+    # clean when there are no sections at all
+    return f"\n{buf.getvalue()}\n"
 
 
 def _build_conversation_flow(
-    requirements: ProductRequirements,
+    pt: str,
     store: DiscoveredStore,
     casual: str,
-    topics: list[str],
+    topic_flow: str,
     min_topics: int,
 ) -> str:
     """Build product-aware, store-aware conversation flow section.
 
     Product-aware: AC needs tonnage confirmation, washing machine needs capacity, etc.
     Store-aware: chain stores get combo/offer questions, local dealers get harder negotiation.
+    pt is the lowercased product type.
     """
-    pt = requirements.product_type.lower()
 
     # Product-specific opening moves
     product_opener = ""
@@ -451,8 +587,6 @@ def _build_conversation_flow(
             "\n- Mention you're checking 2-3 shops. Ask for their best price. Push back gently on the first quote."
         )
 
-    topic_flow = " → ".join(topics)
-
     return f"""CONVERSATION FLOW:
 {product_opener}
 - Ask ONE question at a time. Do not stack 2-3 questions in one response.
@@ -503,12 +637,8 @@ def _build_negotiation_section(research: ResearchOutput) -> str:
     return "NEGOTIATION:\n" + "\n".join(lines)
 
 
-def _build_examples(requirements: ProductRequirements, research: ResearchOutput) -> str:
+def _build_examples(casual: str, research: ResearchOutput) -> str:
     """Build product-specific conversation examples."""
-    casual = _casual_product_name(requirements)
-    # Use first question from research as the opening
-    first_q = research.questions_to_ask[0] if research.questions_to_ask else f"Best price kya doge {casual} ka?"
-
     # Pick a realistic price from research
     price = "38000"
     if research.market_price_range:
@@ -516,14 +646,22 @@ def _build_examples(requirements: ProductRequirements, research: ResearchOutput)
         price = str(mid)
 
     # "Which model?" recovery example using brand name only
-    model_recovery = ""
+    brand = ""
     if research.competing_products:
         brand = _extract_brand(research.competing_products[0].get("name", ""))
-        if brand:
-            model_recovery = (
-                f'\nShopkeeper: "Kaun sa model chahiye?"'
-                f'\nYou: "Achha, {brand} ka {casual} dikhao, price kya hai?"'
-            )
+
+    return _examples_text(casual, price, brand)
+
+
+@functools.lru_cache(maxsize=256)
+def _examples_text(casual: str, price: str, brand: str) -> str:
+    """Examples block for the given inputs — identical across a batch of stores."""
+    model_recovery = ""
+    if brand:
+        model_recovery = (
+            f'\nShopkeeper: "Kaun sa model chahiye?"'
+            f'\nYou: "Achha, {brand} ka {casual} dikhao, price kya hai?"'
+        )
 
     return f"""EXAMPLES:
 You: "Bhaisaab, {casual} hai aapke paas?"
@@ -178,18 +178,24 @@ Research the current market prices, key features, and prepare questions for call
         if response.stop_reason == "tool_use":
             messages.append({"role": "assistant", "content": response.content})
 
+            # Run all of this turn's searches concurrently
+            search_blocks = [
+                block for block in response.content
+                if block.type == "tool_use" and block.name == "web_search"
+            ]
+            queries = [block.input.get("query", "") for block in search_blocks]
+            for query in queries:
+                logger.info(f"Searching: \"{query}\"")
+            all_results = await web_search.search_many(queries, max_results=5)
+
             tool_results = []
-            for block in response.content:
-                if block.type == "tool_use" and block.name == "web_search":
-                    query = block.input.get("query", "")
-                    logger.info(f"Searching: \"{query}\"")
-                    results = await web_search.search(query, max_results=5)
-                    logger.info(f"Got {len(results)} results for \"{query[:50]}\"")
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": json.dumps(results, ensure_ascii=False),
-                    })
+            for block, query, results in zip(search_blocks, queries, all_results):
+                logger.info(f"Got {len(results)} results for \"{query[:50]}\"")
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": json.dumps(results, ensure_ascii=False),
+                })
 
             messages.append({"role": "user", "content": tool_results})
             continue
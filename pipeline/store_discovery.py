@@ -179,8 +179,7 @@ async def _web_search_stores(product_type: str, location: str) -> list[dict]:
     ]
 
     all_results = []
-    for query in queries:
-        results = await web_search.search(query, max_results=5)
+    for results in await web_search.search_many(queries, max_results=5):
         for r in results:
             all_results.append({
                 "name": r.get("title", ""),
@@ -7,9 +7,31 @@ No API key needed.
 
 import asyncio
 import logging
+import threading
+import time
+from collections import OrderedDict
+
+from ddgs import DDGS
 
 logger = logging.getLogger("pipeline.web_search")
 
+# One DDGS per worker thread: it caches its engine instances, and with them
+# their HTTP clients, so repeat searches reuse open connections.
+_local = threading.local()
+
+# Recent results by (query, max_results), oldest first; entries expire after
+# _CACHE_TTL seconds and the oldest are evicted beyond _CACHE_MAX
+_CACHE: OrderedDict[tuple[str, int], tuple[float, list[dict]]] = OrderedDict()
+_CACHE_TTL = 600
+_CACHE_MAX = 256
+
+
+def _client() -> DDGS:
+    client = getattr(_local, "client", None)
+    if client is None:
+        client = _local.client = DDGS()
+    return client
+
 
 async def search(query: str, max_results: int = 5) -> list[dict]:
     """Search the web and return structured results.
@@ -21,14 +43,55 @@ async def search(query: str, max_results: int = 5) -> list[dict]:
     Returns:
         List of dicts with keys: title, url, snippet.
     """
-    return await asyncio.to_thread(_search_sync, query, max_results)
+    key = (query, max_results)
+    now = time.monotonic()
+    hit = _CACHE.get(key)
+    if hit and now - hit[0] < _CACHE_TTL:
+        return _copy(hit[1])
+
+    results = await asyncio.to_thread(_search_sync, query, max_results)
+    # Failed/empty searches aren't cached, so the next call retries
+    if results:
+        # The cache keeps its own copies, so callers may mutate what they get
+        _CACHE[key] = (now, _copy(results))
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return results
+
+
+def _copy(results: list[dict]) -> list[dict]:
+    """Copy a result list, dicts included, so nothing is shared with the cache."""
+    return [dict(r) for r in results]
+
+
+async def search_many(
+    queries: list[str],
+    max_results: int = 5,
+    concurrency: int = 4,
+) -> list[list[dict]]:
+    """Run several searches concurrently, at most `concurrency` at a time.
+
+    Returns one result list per query, in the same order as `queries`. A
+    query that fails gets an empty list, as it would from search().
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(query: str) -> list[dict]:
+        async with sem:
+            try:
+                return await search(query, max_results)
+            except Exception as e:
+                logger.error(f"Search failed for '{query}': {e}")
+                return []
+
+    return await asyncio.gather(*(_one(q) for q in queries))
 
 
 def _search_sync(query: str, max_results: int) -> list[dict]:
     """Synchronous web search using ddgs."""
     try:
-        from ddgs import DDGS
-        raw = DDGS().text(query, max_results=max_results)
+        raw = _client().text(query, max_results=max_results)
         results = [
             {
                 "title": r.get("title", ""),
@@ -17,7 +17,7 @@ sys.path.insert(0, str(os.path.dirname(os.path.dirname(__file__))))
 
 from agent_worker import (
     _normalize_for_tts,
-    _strip_think_tags,
+    _strip_markup,
     _ACTION_RE,
     _replace_numbers,
     _number_to_hindi,
@@ -29,8 +29,16 @@ from agent_worker import (
     SanitizedAgent,
     _create_llm,
     _setup_call_logger,
+    _teardown_call_logger,
     DEFAULT_INSTRUCTIONS,
     CLAUDE_MODEL,
+    _build_instructions,
+    _build_greeting,
+    _with_wall_time,
+    TranscriptEntry,
+    _TranscriptJournal,
+    _read_journal,
+    _recover_journals,
 )
 from call_analysis import ConstraintChecker, ConversationScorer
 from livekit.agents.llm import ChatContext
@@ -61,9 +69,9 @@ def normalize():
 
 
 @pytest.fixture
-def strip_think():
-    """Return the _strip_think_tags function."""
-    return _strip_think_tags
+def strip_markup():
+    """Return the _strip_markup function."""
+    return _strip_markup
 
 
 @pytest.fixture
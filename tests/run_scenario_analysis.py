@@ -17,7 +17,7 @@ os.environ.setdefault("LIVEKIT_API_SECRET", "devsecret")
 from anthropic import Anthropic
 from call_analysis import ConstraintChecker, ConversationScorer
 from tests.shopkeeper_scenarios import SCENARIOS
-from agent_worker import DEFAULT_INSTRUCTIONS, _normalize_for_tts, _strip_think_tags, CLAUDE_MODEL
+from agent_worker import DEFAULT_INSTRUCTIONS, _normalize_for_tts, _strip_markup, CLAUDE_MODEL
 
 
 def _call_claude(client, messages, system):
@@ -29,7 +29,7 @@ def _call_claude(client, messages, system):
         messages=messages,
     )
     text = response.content[0].text
-    text = _strip_think_tags(text)
+    text = _strip_markup(text)
     text = _normalize_for_tts(text)
     return text
 
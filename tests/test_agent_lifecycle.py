@@ -8,6 +8,7 @@ import sys
 import threading
 import time
 from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest import mock
 
 import pytest
@@ -107,6 +108,91 @@ class TestSpawnWorker:
         assert agent_lifecycle._last_spawn_time is not None
         assert before <= agent_lifecycle._last_spawn_time <= after
 
+    def test_starts_worker_in_own_session(self):
+        """Worker gets its own process group so cleanup can signal the tree."""
+        with mock.patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value = mock.MagicMock(pid=1)
+            agent_lifecycle._spawn_worker()
+
+            kwargs = mock_popen.call_args[1]
+            assert kwargs["start_new_session"] is True
+            assert kwargs["close_fds"] is False
+
+
+class TestWaitForWorker:
+    """_wait_for_worker() should return early instead of sleeping blindly."""
+
+    def test_returns_false_when_process_exits(self):
+        proc = mock.MagicMock()
+        proc.poll.return_value = 1
+        with mock.patch("time.sleep") as mock_sleep:
+            assert agent_lifecycle._wait_for_worker(proc) is False
+        mock_sleep.assert_not_called()
+
+    @pytest.fixture
+    def health_server(self):
+        """Local HTTP server standing in for the worker's health endpoint.
+
+        Set .routes[path] = (status, body) to control the responses.
+        """
+        routes = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = routes.get(self.path, (404, b""))
+                self.send_response(status)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        server.routes = routes
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        with mock.patch.object(agent_lifecycle, "_HEALTH_PORT", server.server_address[1]), \
+                mock.patch.object(agent_lifecycle, "_AGENT_MODE", "start"):
+            yield server
+        server.shutdown()
+        server.server_close()
+
+    def _alive(self):
+        proc = mock.MagicMock()
+        proc.poll.return_value = None
+        return proc
+
+    def test_returns_true_when_our_worker_answers(self, health_server):
+        health_server.routes["/"] = (200, b"OK")
+        health_server.routes["/worker"] = (200, json.dumps({"agent_name": "price-agent"}).encode())
+        assert agent_lifecycle._wait_for_worker(self._alive()) is True
+
+    def test_other_service_on_port_is_not_ready(self, health_server):
+        health_server.routes["/"] = (200, b"<html>hello</html>")
+        health_server.routes["/worker"] = (200, b"<html>not json</html>")
+        assert agent_lifecycle._wait_for_worker(self._alive(), timeout=0.2, interval=0.05) is False
+
+    def test_other_agent_is_not_ready(self, health_server):
+        health_server.routes["/"] = (200, b"OK")
+        health_server.routes["/worker"] = (200, json.dumps({"agent_name": "someone-else"}).encode())
+        assert agent_lifecycle._worker_ready(1.0) is False
+
+    def test_unhealthy_worker_is_not_ready(self, health_server):
+        health_server.routes["/"] = (503, b"failed to connect to livekit")
+        health_server.routes["/worker"] = (200, json.dumps({"agent_name": "price-agent"}).encode())
+        assert agent_lifecycle._worker_ready(1.0) is False
+
+    def test_nothing_listening_is_not_ready(self):
+        with mock.patch.object(agent_lifecycle, "_HEALTH_PORT", 1):
+            assert agent_lifecycle._worker_ready(0.1) is False
+
+    def test_dev_mode_waits_out_timeout(self):
+        with mock.patch.object(agent_lifecycle, "_AGENT_MODE", "dev"):
+            with mock.patch.object(agent_lifecycle, "_worker_ready") as mock_ready:
+                with mock.patch("time.sleep") as mock_sleep:
+                    assert agent_lifecycle._wait_for_worker(self._alive(), timeout=0.5, interval=0.1) is False
+        mock_ready.assert_not_called()
+        assert mock_sleep.call_count == 5
+
 
 # ===================================================================
 # C. Watchdog thread
@@ -265,28 +351,49 @@ class TestCleanupAgent:
     """cleanup_agent() should stop watchdog and terminate worker."""
 
     def test_terminates_running_process(self):
-        proc = mock.MagicMock()
+        proc = mock.MagicMock(pid=4321)
         proc.poll.return_value = None  # still running
         proc.wait.return_value = 0
         agent_lifecycle._agent_proc = proc
         agent_lifecycle._watchdog_stop = threading.Event()
 
-        agent_lifecycle.cleanup_agent()
+        with mock.patch("os.killpg") as mock_killpg:
+            with mock.patch("os.pidfd_open", side_effect=OSError, create=True):
+                agent_lifecycle.cleanup_agent()
 
-        proc.terminate.assert_called_once()
+        mock_killpg.assert_called_once_with(4321, signal.SIGTERM)
         assert agent_lifecycle._watchdog_stop.is_set()
 
     def test_kills_on_timeout(self):
-        proc = mock.MagicMock()
+        proc = mock.MagicMock(pid=4321)
         proc.poll.return_value = None
         proc.wait.side_effect = subprocess.TimeoutExpired(cmd="agent", timeout=5)
         agent_lifecycle._agent_proc = proc
         agent_lifecycle._watchdog_stop = threading.Event()
 
+        with mock.patch("os.killpg") as mock_killpg:
+            with mock.patch("os.pidfd_open", side_effect=OSError, create=True):
+                agent_lifecycle.cleanup_agent()
+
+        assert mock_killpg.call_args_list == [
+            mock.call(4321, signal.SIGTERM),
+            mock.call(4321, signal.SIGKILL),
+        ]
+
+    def test_stops_real_subprocess(self):
+        """A real worker exits on SIGTERM and is reaped without the full timeout."""
+        proc = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(60)"],
+            start_new_session=True,
+        )
+        agent_lifecycle._agent_proc = proc
+        agent_lifecycle._watchdog_stop = threading.Event()
+
+        start = time.monotonic()
         agent_lifecycle.cleanup_agent()
 
-        proc.terminate.assert_called_once()
-        proc.kill.assert_called_once()
+        assert proc.returncode == -signal.SIGTERM
+        assert time.monotonic() - start < 4
 
     def test_noop_when_already_dead(self):
         proc = mock.MagicMock()
@@ -294,9 +401,10 @@ class TestCleanupAgent:
         agent_lifecycle._agent_proc = proc
         agent_lifecycle._watchdog_stop = threading.Event()
 
-        agent_lifecycle.cleanup_agent()
+        with mock.patch("os.killpg") as mock_killpg:
+            agent_lifecycle.cleanup_agent()
 
-        proc.terminate.assert_not_called()
+        mock_killpg.assert_not_called()
 
 
 # ===================================================================
@@ -305,23 +413,38 @@ class TestCleanupAgent:
 class TestKillOldAgents:
     """kill_old_agents() edge cases."""
 
-    def test_handles_missing_pgrep(self):
-        """On slim Docker images, pgrep may not exist — should not crash."""
-        with mock.patch("subprocess.run", side_effect=FileNotFoundError):
-            agent_lifecycle.kill_old_agents()  # should not raise
-
-    def test_handles_no_processes(self):
+    @staticmethod
+    def _fake_proc(tmp_path, procs):
+        """Build a fake /proc tree: {pid: cmdline-bytes}."""
+        for pid, cmdline in procs.items():
+            (tmp_path / str(pid)).mkdir()
+            (tmp_path / str(pid) / "cmdline").write_bytes(cmdline)
+        (tmp_path / "self").mkdir()  # non-numeric entries are ignored
+        return str(tmp_path)
+
+    def test_handles_missing_proc(self, tmp_path):
+        """On systems without procfs (e.g. macOS) — should not crash."""
+        with mock.patch.object(agent_lifecycle, "_PROC_DIR", str(tmp_path / "nope")):
+            with mock.patch("os.kill") as mock_kill:
+                agent_lifecycle.kill_old_agents()  # should not raise
+        mock_kill.assert_not_called()
+
+    def test_handles_no_processes(self, tmp_path):
         """When no agent_worker.py processes are running."""
-        result = mock.MagicMock()
-        result.stdout = "\n"
-        with mock.patch("subprocess.run", return_value=result):
-            agent_lifecycle.kill_old_agents()  # should not raise
+        proc_dir = self._fake_proc(tmp_path, {1: b"/sbin/init\0"})
+        with mock.patch.object(agent_lifecycle, "_PROC_DIR", proc_dir):
+            with mock.patch("os.kill") as mock_kill:
+                agent_lifecycle.kill_old_agents()  # should not raise
+        mock_kill.assert_not_called()
 
-    def test_kills_other_pids(self):
+    def test_kills_other_pids(self, tmp_path):
         """Should SIGTERM other agent_worker.py processes, not itself."""
-        result = mock.MagicMock()
-        result.stdout = "1111\n2222\n"
-        with mock.patch("subprocess.run", return_value=result):
+        proc_dir = self._fake_proc(tmp_path, {
+            1111: b"python\0agent_worker.py\0dev\0",
+            2222: b"python\0agent_worker.py\0start\0",
+            3333: b"python\0app.py\0",
+        })
+        with mock.patch.object(agent_lifecycle, "_PROC_DIR", proc_dir):
             with mock.patch("os.getpid", return_value=1111):
                 with mock.patch("os.kill") as mock_kill:
                     with mock.patch("time.sleep"):
@@ -329,6 +452,13 @@ class TestKillOldAgents:
 
                     mock_kill.assert_called_once_with(2222, signal.SIGTERM)
 
+    def test_skips_process_that_exits_mid_scan(self, tmp_path):
+        """A PID dir without a readable cmdline (process died) is skipped."""
+        proc_dir = self._fake_proc(tmp_path, {2222: b"python\0agent_worker.py\0"})
+        (tmp_path / "4444").mkdir()  # no cmdline file
+        with mock.patch.object(agent_lifecycle, "_PROC_DIR", proc_dir):
+            assert agent_lifecycle._find_agent_pids() == [2222]
+
 
 # ===================================================================
 # G. agent_health
@@ -609,3 +739,37 @@ time.sleep(60)
         final_count = int(marker.read_text().strip())
         assert final_count == 1, f"Healthy process should not be restarted, started {final_count} times"
         assert agent_lifecycle._restart_count == 0
+
+
+# ===================================================================
+# J. find_agent_log
+# ===================================================================
+class TestFindAgentLog:
+    """find_agent_log() should pick the newest task output that is an agent log."""
+
+    def setup_method(self):
+        agent_lifecycle._first_agent_output.cache_clear()
+
+    def test_picks_newest_matching_output(self, tmp_path):
+        old = tmp_path / "old.output"
+        old.write_text("INFO livekit.agents starting worker")
+        new = tmp_path / "new.output"
+        new.write_text("INFO price-agent registered")
+        other = tmp_path / "newest.output"
+        other.write_text("unrelated build output")
+        os.utime(old, (1000, 1000))
+        os.utime(new, (2000, 2000))
+        os.utime(other, (3000, 3000))
+        (tmp_path / "ignored.log").write_text("price-agent")
+
+        with mock.patch.object(agent_lifecycle, "_TASK_DIR", str(tmp_path)):
+            assert agent_lifecycle.find_agent_log() == str(new)
+
+    def test_only_reads_file_head(self, tmp_path):
+        """Markers beyond the first 64 KB are not scanned."""
+        f = tmp_path / "big.output"
+        f.write_bytes(b"x" * 70000 + b"price-agent")
+
+        with mock.patch.object(agent_lifecycle, "_TASK_DIR", str(tmp_path)):
+            with mock.patch("glob.glob", return_value=[]):
+                assert agent_lifecycle.find_agent_log() is None
@@ -0,0 +1,193 @@
+"""Tests for pipeline/analysis.py — compare_stores and its comparison cache."""
+
+import io
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from pipeline import analysis
+from pipeline.schemas import CallResult, DiscoveredStore
+
+
+_RESPONSE = {
+    "recommended_store": "Croma",
+    "ranking": [{"store_name": "Croma", "rank": 1}],
+    "summary": "Croma is cheapest.",
+    "max_savings": None,
+}
+
+
+class _FakeClient:
+    """Stands in for Anthropic(); records calls and returns a fixed reply."""
+
+    def __init__(self, text: str):
+        self.calls = 0
+        self.prompts = []
+        self.messages = SimpleNamespace(create=self._create)
+        self._text = text
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        self.prompts.append(kwargs["messages"][0]["content"])
+        return SimpleNamespace(content=[SimpleNamespace(text=self._text)])
+
+
+def _results():
+    return [CallResult(
+        store=DiscoveredStore(name="Croma", area="Koramangala"),
+        extracted_data={"transcript": [{"role": "user", "text": "28000 ka hai"}]},
+        quality_score=0.8,
+    )]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis, "_CACHE_DIR", tmp_path / "comparisons")
+    monkeypatch.delenv("COMPARISON_CACHE", raising=False)
+    return tmp_path / "comparisons"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = _FakeClient(orjson.dumps(_RESPONSE).decode())
+    monkeypatch.setattr(analysis, "_client", lambda: fake)
+    return fake
+
+
+def _only_entry(cache_dir):
+    entries = list(cache_dir.iterdir())
+    assert len(entries) == 1
+    return entries[0]
+
+
+class TestComparisonCache:
+    async def test_miss_calls_llm_and_stores(self, cache_dir, client):
+        result = await analysis.compare_stores(_results(), "split AC")
+        assert client.calls == 1
+        assert result.recommended_store == "Croma"
+        assert orjson.loads(_only_entry(cache_dir).read_bytes()) == _RESPONSE
+
+    async def test_hit_skips_llm(self, cache_dir, client):
+        await analysis.compare_stores(_results(), "split AC")
+        result = await analysis.compare_stores(_results(), "split AC")
+        assert client.calls == 1
+        assert result.summary == "Croma is cheapest."
+
+    async def test_corrupt_entry_is_a_miss(self, cache_dir, client):
+        await analysis.compare_stores(_results(), "split AC")
+        _only_entry(cache_dir).write_bytes(b"{not json")
+        result = await analysis.compare_stores(_results(), "split AC")
+        assert client.calls == 2
+        assert result.recommended_store == "Croma"
+        assert orjson.loads(_only_entry(cache_dir).read_bytes()) == _RESPONSE
+
+    async def test_expired_entry_is_a_miss(self, cache_dir, client):
+        await analysis.compare_stores(_results(), "split AC")
+        old = time.time() - analysis._CACHE_TTL - 60
+        os.utime(_only_entry(cache_dir), (old, old))
+        await analysis.compare_stores(_results(), "split AC")
+        assert client.calls == 2
+
+    async def test_use_cache_false_bypasses_and_refreshes(self, cache_dir, client):
+        await analysis.compare_stores(_results(), "split AC")
+        _only_entry(cache_dir).write_bytes(orjson.dumps({**_RESPONSE, "summary": "stale"}))
+        result = await analysis.compare_stores(_results(), "split AC", use_cache=False)
+        assert client.calls == 2
+        assert result.summary == "Croma is cheapest."
+        assert orjson.loads(_only_entry(cache_dir).read_bytes())["summary"] == "Croma is cheapest."
+
+    async def test_env_bypass(self, cache_dir, client, monkeypatch):
+        await analysis.compare_stores(_results(), "split AC")
+        monkeypatch.setenv("COMPARISON_CACHE", "0")
+        await analysis.compare_stores(_results(), "split AC")
+        assert client.calls == 2
+
+    async def test_incomplete_comparison_not_cached(self, cache_dir, monkeypatch):
+        fake = _FakeClient('{"recommended_store": "Croma", "ranking": []}')
+        monkeypatch.setattr(analysis, "_client", lambda: fake)
+        await analysis.compare_stores(_results(), "split AC")
+        assert not cache_dir.exists() or not any(cache_dir.iterdir())
+
+    def test_key_depends_on_model(self):
+        assert analysis._cache_key("model-a", "prompt") != analysis._cache_key("model-b", "prompt")
+        assert analysis._cache_key("model-a", "prompt") == analysis._cache_key("model-a", "prompt")
+
+
+class TestExtractJsonObject:
+    def test_object_surrounded_by_prose(self):
+        text = 'Here is the analysis:\n{"a": 1, "b": {"c": 2}}\nHope this helps!'
+        assert analysis._extract_json_object(text) == '{"a": 1, "b": {"c": 2}}'
+
+    def test_braces_inside_strings_ignored(self):
+        text = 'x {"summary": "price {approx} }} ok", "n": 1} y'
+        assert analysis._extract_json_object(text) == '{"summary": "price {approx} }} ok", "n": 1}'
+
+    def test_escaped_quotes_inside_strings(self):
+        text = r'{"summary": "he said \"}\" then left", "n": 1} trailing }'
+        assert analysis._extract_json_object(text) == r'{"summary": "he said \"}\" then left", "n": 1}'
+
+    def test_escaped_backslash_before_closing_quote(self):
+        text = r'{"path": "C:\\", "n": {}} rest'
+        assert analysis._extract_json_object(text) == r'{"path": "C:\\", "n": {}}'
+
+    def test_first_of_several_objects(self):
+        assert analysis._extract_json_object('{"a": 1} and {"b": 2}') == '{"a": 1}'
+
+    def test_no_object(self):
+        assert analysis._extract_json_object("no json here") is None
+        assert analysis._extract_json_object("") is None
+
+    def test_unbalanced_object(self):
+        assert analysis._extract_json_object('{"a": {"b": 1}') is None
+
+    async def test_prose_wrapped_response_parsed(self, cache_dir, monkeypatch):
+        fake = _FakeClient(f"Sure! {orjson.dumps(_RESPONSE).decode()} Let me know.")
+        monkeypatch.setattr(analysis, "_client", lambda: fake)
+        result = await analysis.compare_stores(_results(), "split AC")
+        assert result.recommended_store == "Croma"
+        assert result.ranking == _RESPONSE["ranking"]
+
+
+class TestWriteTranscript:
+    def _written(self, messages):
+        buf = io.StringIO()
+        analysis._write_transcript(buf, messages)
+        return buf.getvalue()
+
+    def test_matches_escaping_the_joined_text(self):
+        messages = [
+            {"role": "assistant", "text": 'Bhaiya, "1.5 ton" AC ka price?'},
+            {"role": "user", "text": "₹38,000 — C:\\ path\nand\ttab \x01"},
+            {"role": "user", "text": ""},
+            {"role": "assistant", "text": "अच्छा, installation?"},
+        ]
+        joined = "\n".join([
+            'Agent: Bhaiya, "1.5 ton" AC ka price?',
+            "Shopkeeper: ₹38,000 — C:\\ path\nand\ttab \x01",
+            "Agent: अच्छा, installation?",
+        ])
+        assert self._written(messages) == orjson.dumps(joined).decode()
+
+    def test_empty_transcript(self):
+        assert orjson.loads(self._written([])) == "(no conversation recorded)"
+        assert orjson.loads(self._written([{"role": "user", "text": ""}])) == "(no conversation recorded)"
+
+    async def test_prompt_carries_valid_store_json(self, cache_dir, client):
+        await analysis.compare_stores(_results() * 2, "split AC")
+        prompt = client.prompts[0]
+        start = prompt.index("Store calls:\n") + len("Store calls:\n")
+        stores = orjson.loads(prompt[start:prompt.index("\n\nExtract")])
+        assert stores == [{
+            "store_name": "Croma",
+            "area": "Koramangala",
+            "topics_covered": [],
+            "quality_score": 0.8,
+            "conversation": "Shopkeeper: 28000 ka hai",
+        }] * 2
+
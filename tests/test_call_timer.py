@@ -0,0 +1,45 @@
+"""Tests for _start_call_timer — the SIP max-duration timer."""
+
+import asyncio
+
+from agent_worker import _start_call_timer
+
+
+class TestCallTimer:
+    async def test_fires_after_delay(self):
+        fired = asyncio.Event()
+
+        async def on_expire():
+            fired.set()
+
+        _start_call_timer(0.01, on_expire)
+        await asyncio.wait_for(fired.wait(), timeout=1.0)
+
+    async def test_cancel_before_expiry_never_fires(self):
+        """Ending the call (on_participant_left / session close) cancels the timer."""
+        calls = []
+
+        async def on_expire():
+            calls.append(True)
+
+        timer = _start_call_timer(0.05, on_expire)
+        await asyncio.sleep(0)
+        timer.cancel()
+        await asyncio.sleep(0.15)
+        assert timer.cancelled()
+        assert calls == []
+
+    async def test_cancel_after_firing_lets_hangup_finish(self):
+        """Removing participants triggers the cancel again; hanging up must still complete."""
+        started, release, finished = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+        async def on_expire():
+            started.set()
+            await release.wait()
+            finished.set()
+
+        timer = _start_call_timer(0.01, on_expire)
+        await asyncio.wait_for(started.wait(), timeout=1.0)
+        timer.cancel()
+        release.set()
+        await asyncio.wait_for(finished.wait(), timeout=1.0)
@@ -5,7 +5,7 @@ import re
 import pytest
 from pathlib import Path
 
-from tests.conftest import DEFAULT_INSTRUCTIONS
+from tests.conftest import DEFAULT_INSTRUCTIONS, _build_instructions, _build_greeting
 
 TRANSCRIPTS_DIR = Path(__file__).parent.parent / "transcripts"
 
@@ -92,3 +92,28 @@ class TestSystemPromptStructure:
 
     def test_specifies_end_call_tool(self):
         assert "end_call" in DEFAULT_INSTRUCTIONS
+
+
+class TestDefaultModeInstructions:
+    """Per-call instructions built from DEFAULT_INSTRUCTIONS + dispatch metadata."""
+
+    def test_appends_product_and_store(self):
+        instructions = _build_instructions("Gupta Electronics", "split AC", "")
+        assert instructions.startswith(DEFAULT_INSTRUCTIONS)
+        assert "PRODUCT: split AC" in instructions
+        assert "STORE: Gupta Electronics" in instructions
+        assert "YOUR AREA:" not in instructions
+
+    def test_includes_area_when_given(self):
+        instructions = _build_instructions("Gupta Electronics", "split AC", "Koramangala")
+        assert "YOUR AREA: Koramangala" in instructions
+
+    def test_repeat_calls_reuse_same_string(self):
+        a = _build_instructions("Gupta Electronics", "split AC", "")
+        b = _build_instructions("Gupta Electronics", "split AC", "")
+        assert a is b
+
+    def test_greeting(self):
+        assert _build_greeting("Gupta Electronics", "split AC") == (
+            "Hello, yeh Gupta Electronics hai? split AC ke baare mein poochna tha."
+        )
@@ -0,0 +1,396 @@
+"""Tests for dev_watcher.py — pytest worker, debounced test runs, doc counts, transcripts."""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import dev_watcher
+
+
+# Keep the inner pytest sessions self-contained and quiet
+_ARGS = ["-q", "-p", "no:cacheprovider", "--no-header"]
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    d = dev_watcher._PytestDaemon(root=tmp_path)
+    yield d
+    d.close()
+
+
+class TestPytestDaemon:
+    def test_reports_returncode_and_output(self, tmp_path, daemon):
+        (tmp_path / "test_ok.py").write_text("def test_ok():\n    assert True\n")
+        (tmp_path / "test_bad.py").write_text("def test_bad():\n    assert False\n")
+        rc, output = daemon.run([*_ARGS, "test_ok.py"])
+        assert rc == 0
+        assert dev_watcher._extract_test_count(output) == 1
+        rc, output = daemon.run([*_ARGS, "test_bad.py"])
+        assert rc == 1
+        assert "1 failed" in output
+
+    def test_edited_module_is_reimported(self, tmp_path, daemon):
+        """Each run is a fresh worker, so an edit between runs is picked up."""
+        (tmp_path / "mod.py").write_text("VALUE = 1\n")
+        (tmp_path / "test_mod.py").write_text("import mod\n\ndef test_value():\n    assert mod.VALUE == 1\n")
+        assert daemon.run([*_ARGS, "test_mod.py"])[0] == 0
+        (tmp_path / "mod.py").write_text("VALUE = 2\n")
+        assert daemon.run([*_ARGS, "test_mod.py"])[0] == 1
+
+    def test_next_worker_started_after_run(self, tmp_path, daemon):
+        (tmp_path / "test_ok.py").write_text("def test_ok():\n    pass\n")
+        daemon.run([*_ARGS, "test_ok.py"])
+        warm = daemon._next
+        assert warm is not None and warm.poll() is None
+        daemon.close()
+        assert warm.poll() is not None
+        assert daemon._next is None
+
+    def test_worker_crash_is_a_failure_and_recovers(self, tmp_path, daemon):
+        (tmp_path / "test_crash.py").write_text("import os\n\ndef test_crash():\n    os._exit(3)\n")
+        (tmp_path / "test_ok.py").write_text("def test_ok():\n    pass\n")
+        assert daemon.run([*_ARGS, "test_crash.py"])[0] == 1
+        assert daemon.run([*_ARGS, "test_ok.py"])[0] == 0
+
+    def test_warm_worker_dies_before_args_are_sent(self, tmp_path, daemon):
+        (tmp_path / "test_ok.py").write_text("def test_ok():\n    pass\n")
+        daemon.run([*_ARGS, "test_ok.py"])
+        warm = daemon._next
+        warm.kill()
+        warm.wait()
+        warm.poll = lambda: None  # looks alive at the check, as in the race
+        assert daemon.run([*_ARGS, "test_ok.py"])[0] == 0
+        assert daemon._next is not None and daemon._next is not warm
+
+
+class TestRunTestsArgs:
+    @pytest.fixture
+    def seen(self, monkeypatch):
+        calls = []
+
+        class _Recorder:
+            def run(self, args):
+                calls.append(args)
+                return 0, "3 passed"
+
+        monkeypatch.setattr(dev_watcher, "_daemon", _Recorder())
+        monkeypatch.setattr(dev_watcher, "_XDIST_ARGS", ["-n", "auto"])
+        monkeypatch.setattr(dev_watcher, "_has_last_failed", lambda: False)
+        return calls
+
+    def test_serial_by_default(self, seen):
+        assert dev_watcher.run_tests() == (True, 3)
+        assert "-n" not in seen[0]
+
+    def test_parallel_full_run(self, seen):
+        dev_watcher.run_tests(parallel=True)
+        assert seen[0][-2:] == ["-n", "auto"]
+
+    def test_parallel_skipped_for_targeted_runs(self, seen, monkeypatch):
+        dev_watcher.run_tests(targets=["tests/test_logs.py"], parallel=True)
+        monkeypatch.setattr(dev_watcher, "_has_last_failed", lambda: True)
+        dev_watcher.run_tests(last_failed=True, parallel=True)
+        assert all("-n" not in args for args in seen)
+
+
+class TestUpdateFileCounts:
+    @pytest.mark.parametrize("before, after", [
+        ("pytest tests/ -v   # 141 passed\n", "pytest tests/ -v   # 200 passed\n"),
+        ("**Total: 141 passed** (unit tests)\n", "**Total: 200 passed** (unit tests)\n"),
+        ("**With `--live`: 141 + 26 live tests**\n", "**With `--live`: 200 + 26 live tests**\n"),
+        ("├── tests/  # pytest test suite (141 unit + 26 live tests)\n",
+         "├── tests/  # pytest test suite (200 unit + 26 live tests)\n"),
+        ("4. Run `pytest tests/ -v` to verify all 141 tests still pass\n",
+         "4. Run `pytest tests/ -v` to verify all 200 tests still pass\n"),
+        ("Step 141: nothing to see; 141 tests\n", "Step 141: nothing to see; 141 tests\n"),
+    ])
+    def test_doc_forms(self, tmp_path, before, after):
+        doc = tmp_path / "doc.md"
+        doc.write_text(before)
+        dev_watcher._update_file_counts(doc, 200)
+        assert doc.read_text() == after
+
+    def test_every_form_in_one_file(self, tmp_path):
+        doc = tmp_path / "doc.md"
+        doc.write_text("# 9 passed\n**Total: 9 passed**\n9 + 4 live\n(9 unit\nverify all 9 tests\n")
+        dev_watcher._update_file_counts(doc, 12)
+        assert doc.read_text() == "# 12 passed\n**Total: 12 passed**\n12 + 4 live\n(9 unit\nverify all 12 tests\n"
+
+    def test_current_file_not_rewritten(self, tmp_path):
+        doc = tmp_path / "doc.md"
+        doc.write_text("**Total: 200 passed**\n200 + 26 live\n")
+        os.utime(doc, ns=(1_000_000_000, 1_000_000_000))
+        dev_watcher._update_file_counts(doc, 200)
+        assert doc.stat().st_mtime_ns == 1_000_000_000
+
+    def test_missing_file_ignored(self, tmp_path):
+        dev_watcher._update_file_counts(tmp_path / "absent.md", 200)
+        assert not (tmp_path / "absent.md").exists()
+
+
+class TestUpdateDocCounts:
+    @pytest.fixture
+    def docs(self, tmp_path, monkeypatch):
+        docs = [tmp_path / "README.md", tmp_path / "tests.md"]
+        for doc in docs:
+            doc.write_text("**Total: 10 passed**\n")
+        monkeypatch.setattr(dev_watcher, "DOC_FILES", docs)
+        monkeypatch.setattr(dev_watcher, "_last_counts", {})
+        return docs
+
+    def test_new_count_updates_every_doc(self, docs):
+        dev_watcher.update_doc_counts(12)
+        assert [doc.read_text() for doc in docs] == ["**Total: 12 passed**\n"] * 2
+
+    def test_repeated_count_does_no_io(self, docs, monkeypatch):
+        dev_watcher.update_doc_counts(12)
+        touched = []
+        monkeypatch.setattr(dev_watcher, "_update_file_counts", lambda doc, count: touched.append(doc))
+        dev_watcher.update_doc_counts(12)
+        assert touched == []
+        dev_watcher.update_doc_counts(13)
+        assert sorted(touched) == sorted(docs)
+
+
+class TestWaitSettled:
+    @pytest.fixture
+    def writer(self, tmp_path):
+        """Append to a file every 5 ms until stop is set (or `for_sec` passes)."""
+        path = tmp_path / "call.json"
+        path.write_text("")
+        stop = threading.Event()
+        threads = []
+
+        def start(for_sec=None):
+            def grow():
+                deadline = None if for_sec is None else time.monotonic() + for_sec
+                while not stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                    with path.open("a") as f:
+                        f.write("x" * 64)
+                    time.sleep(0.005)
+
+            t = threading.Thread(target=grow, daemon=True)
+            t.start()
+            threads.append(t)
+
+        yield SimpleNamespace(path=path, start=start, stop=stop, threads=threads)
+        stop.set()
+        for t in threads:
+            t.join()
+
+    def test_returns_once_growth_stops(self, writer):
+        writer.start(for_sec=0.3)
+        began = time.monotonic()
+        dev_watcher._wait_settled(writer.path, timeout=5.0)
+        assert time.monotonic() - began >= 0.3
+        assert not writer.threads[0].is_alive()
+        size = writer.path.stat().st_size
+        time.sleep(0.05)
+        assert writer.path.stat().st_size == size
+
+    def test_gives_up_after_timeout(self, writer):
+        writer.start()
+        began = time.monotonic()
+        dev_watcher._wait_settled(writer.path, timeout=0.2)
+        elapsed = time.monotonic() - began
+        assert 0.2 <= elapsed < 1.0
+        assert writer.threads[0].is_alive()
+
+    def test_settled_file_returns_quickly(self, writer):
+        began = time.monotonic()
+        dev_watcher._wait_settled(writer.path, timeout=5.0)
+        assert time.monotonic() - began < 0.5
+
+
+class TestNeedsAnalysis:
+    @pytest.fixture
+    def transcript(self, tmp_path, monkeypatch):
+        analyzed = []
+
+        def fake_analyze(path):
+            analyzed.append(path)
+            out = path.with_suffix(".analysis.json")
+            out.write_bytes(b'{"overall_score": 0.9, "topics_covered": [], "turn_count": 2}')
+            return out
+
+        monkeypatch.setattr(dev_watcher, "_analyze", fake_analyze)
+        path = tmp_path / "call.json"
+        path.write_text('{"turns": 1}')
+        return SimpleNamespace(path=path, analyzed=analyzed)
+
+    def test_unanalyzed_transcript_needs_analysis(self, transcript):
+        assert dev_watcher._needs_analysis(transcript.path)
+
+    def test_unchanged_content_skipped(self, transcript):
+        dev_watcher.run_analysis(transcript.path)
+        assert transcript.analyzed == [transcript.path]
+        transcript.path.write_text('{"turns": 1}')  # touched, same bytes
+        assert not dev_watcher._needs_analysis(transcript.path)
+
+    def test_changed_content_reanalyzed(self, transcript):
+        dev_watcher.run_analysis(transcript.path)
+        transcript.path.write_text('{"turns": 2}')
+        assert dev_watcher._needs_analysis(transcript.path)
+        dev_watcher.run_analysis(transcript.path)
+        assert not dev_watcher._needs_analysis(transcript.path)
+
+    def test_missing_sidecar_reanalyzed(self, transcript):
+        dev_watcher.run_analysis(transcript.path)
+        transcript.path.with_suffix(".analysis.sha").unlink()
+        assert dev_watcher._needs_analysis(transcript.path)
+
+    def test_failed_analysis_writes_no_sidecar(self, transcript, monkeypatch):
+        def broken(path):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(dev_watcher, "_analyze", broken)
+        dev_watcher.run_analysis(transcript.path)
+        assert not transcript.path.with_suffix(".analysis.sha").exists()
+
+
+class TestPollTranscripts:
+    def test_missing_directory_yields_nothing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(dev_watcher, "TRANSCRIPTS_DIR", tmp_path / "transcripts")
+        assert list(dev_watcher._poll_transcripts({})) == []
+
+    def test_directory_removed_and_recreated(self, tmp_path, monkeypatch):
+        transcripts = tmp_path / "transcripts"
+        monkeypatch.setattr(dev_watcher, "TRANSCRIPTS_DIR", transcripts)
+        transcripts.mkdir()
+        (transcripts / "a.json").write_text("{}")
+        (transcripts / "a.analysis.json").write_text("{}")
+        seen = {}
+        assert [(p.name, new) for p, new in dev_watcher._poll_transcripts(seen)] == [("a.json", True)]
+
+        (transcripts / "a.json").unlink()
+        (transcripts / "a.analysis.json").unlink()
+        transcripts.rmdir()
+        assert list(dev_watcher._poll_transcripts(seen)) == []
+
+        transcripts.mkdir()
+        (transcripts / "a.json").write_text("{}")
+        assert [(p.name, new) for p, new in dev_watcher._poll_transcripts(seen)] == [("a.json", True)]
+
+
+class TestCodeChangeHandler:
+    @pytest.fixture
+    def handler(self, monkeypatch):
+        # Consumer does nothing: events stay in the queue for inspection
+        monkeypatch.setattr(dev_watcher.CodeChangeHandler, "_loop", lambda self: None)
+        return dev_watcher.CodeChangeHandler(include_live=False, update_docs=False)
+
+    def _queued(self, handler):
+        out = []
+        while not handler._queue.empty():
+            out.append(handler._queue.get_nowait())
+        return out
+
+    def test_modified_python_file_queued(self, handler):
+        from watchdog.events import FileCreatedEvent, FileModifiedEvent
+        src = str(dev_watcher.PROJECT_ROOT / "agent_worker.py")
+        handler.dispatch(FileModifiedEvent(src))
+        handler.dispatch(FileCreatedEvent(src))
+        handler.dispatch(FileModifiedEvent(str(dev_watcher.PROJECT_ROOT / "README.md")))
+        assert self._queued(handler) == [dev_watcher.PROJECT_ROOT / "agent_worker.py"]
+
+
+class TestDebounceLoop:
+    @pytest.fixture
+    def runs(self, monkeypatch):
+        """Start a handler whose consumer loop really runs, with stubbed pytest.
+
+        calls records run_tests kwargs, results queues their return values,
+        doc_counts records update_doc_counts calls, and done is released once
+        per finished _run().
+        """
+        calls = []
+        done = threading.Semaphore(0)
+        results = []
+
+        def fake_run_tests(include_live=False, **kwargs):
+            calls.append(kwargs)
+            result = results.pop(0) if results else (True, 3)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        original_run = dev_watcher.CodeChangeHandler._run
+
+        def tracked_run(self):
+            try:
+                original_run(self)
+            finally:
+                done.release()
+
+        monkeypatch.setattr(dev_watcher, "run_tests", fake_run_tests)
+        monkeypatch.setattr(dev_watcher.CodeChangeHandler, "_run", tracked_run)
+        monkeypatch.setattr(dev_watcher, "_has_last_failed", lambda: False)
+        doc_counts = []
+        monkeypatch.setattr(dev_watcher, "update_doc_counts", doc_counts.append)
+
+        def start(update_docs=False):
+            handler = dev_watcher.CodeChangeHandler(include_live=False, update_docs=update_docs)
+            handler._debounce_sec = 0.05
+            return handler
+
+        return SimpleNamespace(start=start, calls=calls, done=done, results=results, doc_counts=doc_counts)
+
+    def test_failed_run_keeps_consumer_alive(self, runs):
+        runs.results.append(BrokenPipeError("worker gone"))
+        handler = runs.start()
+        src = dev_watcher.PROJECT_ROOT / "agent_worker.py"
+        handler._queue.put(src)
+        assert runs.done.acquire(timeout=5)
+        handler._queue.put(src)
+        assert runs.done.acquire(timeout=5)
+        assert len(runs.calls) == 2
+
+    def _burst(self, runs, handler, *names):
+        for name in names:
+            handler._queue.put(dev_watcher.PROJECT_ROOT / name)
+        assert runs.done.acquire(timeout=5)
+
+    def test_burst_coalesced_into_one_run(self, runs):
+        handler = runs.start()
+        self._burst(runs, handler, "agent_worker.py", "agent_worker.py", "agent_lifecycle.py")
+        assert not runs.done.acquire(timeout=0.2)
+        assert len(runs.calls) == 1
+
+    def test_edited_test_files_targeted(self, runs):
+        handler = runs.start(update_docs=True)
+        self._burst(runs, handler, "tests/test_logs.py", "agent_worker.py", "tests/conftest.py",
+                    "tests/test_analysis.py")
+        assert runs.calls == [{"targets": ["tests/test_analysis.py", "tests/test_logs.py"]}]
+        assert runs.doc_counts == []
+
+    def test_source_change_reruns_last_failed(self, runs):
+        handler = runs.start(update_docs=True)
+        self._burst(runs, handler, "tests/conftest.py")
+        assert runs.calls == [{"last_failed": True, "parallel": False}]
+
+    def test_full_run_updates_docs(self, runs):
+        handler = runs.start(update_docs=True)
+        self._burst(runs, handler, "agent_worker.py")
+        assert runs.doc_counts == [3]
+
+    def test_last_failed_subset_leaves_docs(self, runs, monkeypatch):
+        monkeypatch.setattr(dev_watcher, "_has_last_failed", lambda: True)
+        handler = runs.start(update_docs=True)
+        self._burst(runs, handler, "agent_worker.py")
+        assert runs.calls == [{"last_failed": True, "parallel": False}]
+        assert runs.doc_counts == []
+
+    def test_failed_or_disabled_runs_leave_docs(self, runs):
+        runs.results.append((False, 3))
+        handler = runs.start(update_docs=True)
+        self._burst(runs, handler, "agent_worker.py")
+        self._burst(runs, runs.start(update_docs=False), "agent_worker.py")
+        assert len(runs.calls) == 2
+        assert runs.doc_counts == []
+
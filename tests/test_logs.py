@@ -4,67 +4,65 @@ import logging
 import os
 from pathlib import Path
 
-from tests.conftest import _setup_call_logger
+from tests.conftest import _setup_call_logger, _teardown_call_logger
+
+TS = "20260211_172740"
 
 
 class TestSetupCallLogger:
     def test_creates_log_file(self):
-        handler, log_path = _setup_call_logger("Test Store")
+        handler, listener, log_path = _setup_call_logger("Test_Store", TS)
         try:
             assert Path(log_path).exists()
             assert "Test_Store" in log_path
             assert log_path.endswith(".log")
         finally:
-            logging.getLogger().removeHandler(handler)
-            handler.close()
+            _teardown_call_logger(handler, listener)
             os.unlink(log_path)
 
     def test_handler_attached_to_root(self):
-        handler, log_path = _setup_call_logger("Test Store 2")
+        handler, listener, log_path = _setup_call_logger("Test_Store_2", TS)
         try:
             assert handler in logging.getLogger().handlers
         finally:
-            logging.getLogger().removeHandler(handler)
-            handler.close()
+            _teardown_call_logger(handler, listener)
             os.unlink(log_path)
 
     def test_handler_level_is_debug(self):
-        handler, log_path = _setup_call_logger("Test Store 3")
+        handler, listener, log_path = _setup_call_logger("Test_Store_3", TS)
         try:
             assert handler.level == logging.DEBUG
+            assert all(h.level == logging.DEBUG for h in listener.handlers)
         finally:
-            logging.getLogger().removeHandler(handler)
-            handler.close()
+            _teardown_call_logger(handler, listener)
             os.unlink(log_path)
 
     def test_log_messages_written_to_file(self):
-        handler, log_path = _setup_call_logger("Test Store 4")
+        handler, listener, log_path = _setup_call_logger("Test_Store_4", TS)
         try:
             test_logger = logging.getLogger("test.log.write")
             test_logger.setLevel(logging.DEBUG)
             test_logger.info("Test message for log file")
-            handler.flush()
-            content = Path(log_path).read_text()
-            assert "Test message for log file" in content
         finally:
-            logging.getLogger().removeHandler(handler)
-            handler.close()
-            os.unlink(log_path)
+            _teardown_call_logger(handler, listener)  # drains the queue
+        content = Path(log_path).read_text()
+        os.unlink(log_path)
+        assert "Test message for log file" in content
+        assert "[test.log.write] INFO:" in content
 
-    def test_store_name_spaces_replaced(self):
-        handler, log_path = _setup_call_logger("Pai International Jayanagar")
+    def test_filename_is_store_and_call_timestamp(self):
+        handler, listener, log_path = _setup_call_logger("Pai_International_Jayanagar", TS)
         try:
-            assert "Pai_International_Jayanagar" in log_path
+            assert Path(log_path).name == f"Pai_International_Jayanagar_{TS}.log"
         finally:
-            logging.getLogger().removeHandler(handler)
-            handler.close()
+            _teardown_call_logger(handler, listener)
             os.unlink(log_path)
 
     def test_cleanup_removes_handler(self):
-        handler, log_path = _setup_call_logger("Cleanup Test")
+        handler, listener, log_path = _setup_call_logger("Cleanup_Test", TS)
         root = logging.getLogger()
         assert handler in root.handlers
-        root.removeHandler(handler)
-        handler.close()
+        _teardown_call_logger(handler, listener)
         assert handler not in root.handlers
+        assert all(h.stream is None for h in listener.handlers)  # file closed
         os.unlink(log_path)
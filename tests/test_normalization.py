@@ -1,8 +1,8 @@
-"""Tests for TTS text normalization — _normalize_for_tts, _strip_think_tags, _ACTION_RE, number conversion, Devanagari transliteration, streaming number buffer."""
+"""Tests for TTS text normalization — _normalize_for_tts, _strip_markup, _ACTION_RE, number conversion, Devanagari transliteration, streaming number buffer."""
 
 import pytest
 from tests.conftest import (
-    _normalize_for_tts, _strip_think_tags, _replace_numbers,
+    _normalize_for_tts, _strip_markup, _replace_numbers,
     _number_to_hindi, _transliterate_devanagari, _NumberBufferedNormalizer,
 )
 
@@ -115,6 +115,13 @@ class TestNumberReplacementInText:
         result = _replace_numbers("500 extra")
         assert "paanch sau" in result
 
+    def test_devanagari_digits_converted(self):
+        """Non-ASCII digits must not take the ASCII-only no-digits fast path."""
+        assert _replace_numbers("price ५०० hai") == "price paanch sau hai"
+
+    def test_non_ascii_text_without_digits_unchanged(self):
+        assert _replace_numbers("दाम बताइए") == "दाम बताइए"
+
 
 # ===================================================================
 # B. Spacing fixes (lowercase→uppercase, digit→letter)
@@ -154,6 +161,11 @@ class TestSpacingFixes:
         result = normalize("Installationfree")
         assert "Installation" in result
 
+    def test_adjacent_transitions_all_spaced(self, normalize):
+        # Every boundary is fixed, even when transitions share a character
+        assert normalize("5starAC") == "5 star AC"
+        assert normalize("mode5X") == "mode 5 X"
+
 
 # ===================================================================
 # C. Action marker stripping
@@ -185,37 +197,43 @@ class TestActionMarkerStripping:
 
 
 # ===================================================================
-# D. Think-tag stripping
+# D. Markup stripping (think tags, action markers)
 # ===================================================================
-class TestStripThinkTags:
-    def test_complete_think_tag(self, strip_think):
-        assert strip_think("<think>reasoning</think>Hello") == "Hello"
+class TestStripMarkup:
+    def test_complete_think_tag(self, strip_markup):
+        assert strip_markup("<think>reasoning</think>Hello") == "Hello"
 
-    def test_multiline_think_tag(self, strip_think):
-        result = strip_think("<think>\nI should ask about price\n</think>Namaste")
+    def test_multiline_think_tag(self, strip_markup):
+        result = strip_markup("<think>\nI should ask about price\n</think>Namaste")
         assert result == "Namaste"
 
-    def test_unclosed_think_tag_streaming(self, strip_think):
-        assert strip_think("<think>partial reasoning") == ""
+    def test_unclosed_think_tag_streaming(self, strip_markup):
+        assert strip_markup("<think>partial reasoning") == ""
 
-    def test_no_think_tags(self, strip_think):
-        assert strip_think("Normal text") == "Normal text"
+    def test_no_think_tags(self, strip_markup):
+        assert strip_markup("Normal text") == "Normal text"
 
-    def test_empty_think_tag(self, strip_think):
-        assert strip_think("<think></think>Achha") == "Achha"
+    def test_empty_think_tag(self, strip_markup):
+        assert strip_markup("<think></think>Achha") == "Achha"
 
-    def test_think_tag_with_content_after(self, strip_think):
-        result = strip_think("<think>Let me negotiate</think>Thoda kam karo")
+    def test_think_tag_with_content_after(self, strip_markup):
+        result = strip_markup("<think>Let me negotiate</think>Thoda kam karo")
         assert result == "Thoda kam karo"
 
-    def test_multiple_think_tags(self, strip_think):
-        result = strip_think("<think>first</think>Hello<think>second</think> ji")
+    def test_multiple_think_tags(self, strip_markup):
+        result = strip_markup("<think>first</think>Hello<think>second</think> ji")
         assert "first" not in result
         assert "second" not in result
         assert "Hello" in result
 
-    def test_think_tag_only(self, strip_think):
-        assert strip_think("<think>only thinking</think>") == ""
+    def test_think_tag_only(self, strip_markup):
+        assert strip_markup("<think>only thinking</think>") == ""
+
+    def test_action_markers_removed(self, strip_markup):
+        assert strip_markup("Achha *pauses* theek hai (laughs)") == "Achha  theek hai "
+
+    def test_think_tag_and_action_marker_together(self, strip_markup):
+        assert strip_markup("<think>plan</think>Haan [smiles] ji") == "Haan  ji"
 
 
 # ===================================================================
@@ -192,12 +192,12 @@ class TestBuildPromptWithResearch:
         req = _req(category="Medium double door fridge with separate freezer section (220-280L)")
         prompt = build_prompt(req, research, _store())
         # Find the PRODUCT: line
-        for line in prompt.split("\n"):
-            if line.startswith("PRODUCT:"):
-                assert "Medium double door fridge with separate freezer section (220-280L)" in line
-                break
-        else:
+        start = prompt.find("\nPRODUCT:") + 1
+        if not prompt.startswith("PRODUCT:", start):
             pytest.fail("PRODUCT: line not found")
+        end = prompt.find("\n", start)
+        line = prompt[start:end if end >= 0 else None]
+        assert "Medium double door fridge with separate freezer section (220-280L)" in line
 
     def test_model_recovery_in_examples(self):
         """EXAMPLES should include a 'which model?' recovery when competing_products exist."""
@@ -224,10 +224,20 @@ class TestBuildPromptWithResearch:
             _research(), _store("Reliance"),
         )
         # The greeting note should contain the casual name, not the verbose one
-        note_section = prompt.split("NOTE:")[1]
+        note_section = prompt[prompt.index("NOTE:") + len("NOTE:"):]
         assert "double door fridge" in note_section
         assert "(220-280L)" not in note_section
 
+    def test_greeting_note_can_be_omitted(self):
+        """include_greeting_note=False should drop the NOTE when no greeting was sent."""
+        prompt = build_prompt(
+            _req(category="split AC"), _research(), _store("Croma"),
+            include_greeting_note=False,
+        )
+        assert "NOTE: You have already greeted" not in prompt
+        assert "Do NOT repeat the greeting" not in prompt
+        assert "STORE: Croma" in prompt
+
 
 # ---------------------------------------------------------------------------
 # TestResearchIntelligenceSections (F2)
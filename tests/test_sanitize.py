@@ -1,4 +1,8 @@
-"""Tests for SanitizedAgent._sanitize_chat_ctx, character break detection, STT garbage filter."""
+"""Tests for SanitizedAgent._sanitize_chat_ctx, llm_node streaming, character break detection, STT garbage filter."""
+
+from unittest import mock
+
+from livekit.agents import Agent, llm
 
 from tests.conftest import SanitizedAgent, _is_character_break, _is_likely_garbage, DEFAULT_INSTRUCTIONS
 
@@ -50,6 +54,19 @@ class TestSanitizeChatCtx:
         result = SanitizedAgent._sanitize_chat_ctx(ctx)
         assert result is not ctx
 
+    def test_valid_context_not_copied(self, make_chat_ctx):
+        """No-op sanitization returns the original context without copying."""
+        ctx = make_chat_ctx([("system", "A"), ("user", "Hi"), ("assistant", "Namaste")])
+        with mock.patch.object(type(ctx), "copy") as mock_copy:
+            result = SanitizedAgent._sanitize_chat_ctx(ctx)
+        assert result is ctx
+        mock_copy.assert_not_called()
+
+    def test_original_untouched_when_injecting(self, make_chat_ctx):
+        ctx = make_chat_ctx([("system", "A"), ("assistant", "stale"), ("user", "Hi")])
+        SanitizedAgent._sanitize_chat_ctx(ctx)
+        assert [i.role for i in ctx.items] == ["system", "assistant", "user"]
+
     def test_user_first_no_system(self, make_chat_ctx):
         ctx = make_chat_ctx([("user", "Hello"), ("assistant", "Hi")])
         result = SanitizedAgent._sanitize_chat_ctx(ctx)
@@ -64,6 +81,65 @@ class TestSanitizeChatCtx:
         assert non_system[1].role == "assistant"
 
 
+class TestLlmNodeStreaming:
+    """llm_node cleans text in both str and ChatChunk streams."""
+
+    @staticmethod
+    async def _run(chunks, make_chat_ctx):
+        async def fake_llm_node(agent, chat_ctx, tools, model_settings):
+            for c in chunks:
+                yield c
+
+        agent = SanitizedAgent(instructions="x")
+        ctx = make_chat_ctx([("system", "x"), ("user", "Hello")])
+        with mock.patch.object(Agent.default, "llm_node", fake_llm_node):
+            out = [c async for c in agent.llm_node(ctx, [], None)]
+        return agent, out
+
+    async def test_str_chunks_normalized(self, make_chat_ctx):
+        agent, out = await self._run(["<think>hmm</think>Achha, ", "28", "000 ka hai"], make_chat_ctx)
+        assert "".join(out) == "Achha, attaaees hazaar ka hai"
+        assert agent._last_response_text == "Achha, attaaees hazaar ka hai"
+
+    async def test_chat_chunks_normalized(self, make_chat_ctx):
+        chunks = [
+            llm.ChatChunk(id="1", delta=llm.ChoiceDelta(role="assistant", content="Price 5")),
+            llm.ChatChunk(id="1", delta=None),
+            llm.ChatChunk(id="1", delta=llm.ChoiceDelta(role="assistant", content="00 hai")),
+        ]
+        agent, out = await self._run(chunks, make_chat_ctx)
+        assert len(out) == 3
+        assert agent._last_response_text == "Price paanch sau hai"
+
+    async def test_greeting_first_sanitized_every_turn(self, make_chat_ctx):
+        """Assistant-first history keeps needing the synthetic user message."""
+        seen = []
+
+        async def fake_llm_node(agent, chat_ctx, tools, model_settings):
+            seen.append([i.role for i in chat_ctx.items])
+            yield "ji"
+
+        agent = SanitizedAgent(instructions="x")
+        ctx = make_chat_ctx([("system", "x"), ("assistant", "greeting"), ("user", "Hello")])
+        with mock.patch.object(Agent.default, "llm_node", fake_llm_node):
+            [c async for c in agent.llm_node(ctx, [], None)]
+            ctx.add_message(role="assistant", content="Achha")
+            ctx.add_message(role="user", content="38000")
+            [c async for c in agent.llm_node(ctx, [], None)]
+        assert seen == [
+            ["system", "user", "assistant", "user"],
+            ["system", "user", "assistant", "user", "assistant", "user"],
+        ]
+        # The synthetic message goes into a copy, never the session's history
+        assert [i.role for i in ctx.items] == ["system", "assistant", "user", "assistant", "user"]
+
+    async def test_context_not_serialized_when_logging_disabled(self, make_chat_ctx):
+        with mock.patch("agent_worker.logger.isEnabledFor", return_value=False):
+            with mock.patch.object(llm.ChatContext, "to_provider_format") as mock_fmt:
+                await self._run(["Achha ji"], make_chat_ctx)
+        mock_fmt.assert_not_called()
+
+
 class TestCharacterBreakDetection:
     """Tests for _is_character_break — detects English responses from the LLM."""
 
@@ -13,7 +13,7 @@ from anthropic import Anthropic
 
 from call_analysis import ConstraintChecker, ConversationScorer
 from tests.shopkeeper_scenarios import SCENARIOS
-from agent_worker import DEFAULT_INSTRUCTIONS, _normalize_for_tts, _strip_think_tags, CLAUDE_MODEL
+from agent_worker import DEFAULT_INSTRUCTIONS, _normalize_for_tts, _strip_markup, CLAUDE_MODEL
 
 
 # ---------------------------------------------------------------------------
@@ -29,7 +29,7 @@ def _call_claude(client: Anthropic, messages: list[dict], system: str) -> str:
         messages=messages,
     )
     text = response.content[0].text
-    text = _strip_think_tags(text)
+    text = _strip_markup(text)
     text = _normalize_for_tts(text)
     return text
 
@@ -1,10 +1,20 @@
 """Tests for transcript JSON schema validation and save logic."""
 
 import json
+import os
+import time
 import pytest
 from datetime import datetime
 from pathlib import Path
 
+from tests.conftest import (
+    TranscriptEntry,
+    _TranscriptJournal,
+    _read_journal,
+    _recover_journals,
+    _with_wall_time,
+)
+
 TRANSCRIPTS_DIR = Path(__file__).parent.parent / "transcripts"
 
 
@@ -90,3 +100,104 @@ class TestTranscriptSaveLogic:
         filename = f"{store_name.replace(' ', '_')}_{ts}.json"
         assert " " not in filename
         assert filename.endswith(".json")
+
+    def test_monotonic_offset_converted_to_iso_time(self):
+        start = datetime(2026, 2, 11, 17, 27, 40)
+        msg = _with_wall_time(TranscriptEntry("user", "Hello", 1.5), start)
+        assert msg == {"role": "user", "text": "Hello", "time": "2026-02-11T17:27:41.500000"}
+        assert "interrupted" not in msg
+
+    def test_interrupted_flag_preserved(self):
+        start = datetime(2026, 2, 11, 17, 27, 40)
+        msg = _with_wall_time(TranscriptEntry("assistant", "Achha", 0.0, True), start)
+        assert msg["interrupted"] is True
+        assert set(msg) == {"role", "text", "time", "interrupted"}
+
+
+class TestTranscriptJournal:
+    """Crash-recovery journal: written per message, removed after the save."""
+
+    HEADER = {
+        "started": "2026-02-11T17:27:40",
+        "store_name": "Test Store",
+        "product_description": "split AC",
+        "room": "test-room",
+        "phone": "browser",
+    }
+
+    def _journal(self, tmp_path):
+        return _TranscriptJournal(tmp_path / "Test_Store_20260211_172740.jsonl", self.HEADER)
+
+    def _age(self, path, seconds):
+        old = time.time() - seconds
+        os.utime(path, (old, old))
+
+    def test_message_is_journaled(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        lines = journal.path.read_text(encoding="utf-8").splitlines()
+        assert json.loads(lines[0]) == self.HEADER
+        assert json.loads(lines[1]) == {"role": "user", "text": "Hello", "t": 1.5, "interrupted": False}
+        journal.close()
+
+    def test_no_file_until_first_message(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.close()
+        assert not journal.path.exists()
+
+    def test_discard_removes_file(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        journal.discard()
+        assert not journal.path.exists()
+
+    def test_read_journal_rebuilds_transcript(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        journal.append(TranscriptEntry("assistant", "ए सी का रेट", 3.0, True))
+        journal.close()
+        data = _read_journal(journal.path)
+        assert TestTranscriptSchema.REQUIRED_TOP_KEYS.issubset(data)
+        assert data["store_name"] == "Test Store"
+        assert data["messages"] == [
+            {"role": "user", "text": "Hello", "time": "2026-02-11T17:27:41.500000"},
+            {"role": "assistant", "text": "ए सी का रेट", "time": "2026-02-11T17:27:43", "interrupted": True},
+        ]
+
+    def test_torn_last_line_ignored(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        journal.close()
+        with open(journal.path, "ab") as f:
+            f.write(b'{"role": "assis')
+        assert len(_read_journal(journal.path)["messages"]) == 1
+
+    def test_recover_stale_journal(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        journal.close()
+        self._age(journal.path, 3600)
+        recovered = _recover_journals(tmp_path, min_age=600)
+        assert recovered == [journal.path.with_suffix(".json")]
+        assert not journal.path.exists()
+        data = json.loads(recovered[0].read_text(encoding="utf-8"))
+        assert data["messages"][0]["text"] == "Hello"
+        assert data["recovered"] is True
+
+    def test_recent_journal_left_alone(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        assert _recover_journals(tmp_path, min_age=600) == []
+        assert journal.path.exists()
+        journal.close()
+
+    def test_recover_keeps_existing_transcript(self, tmp_path):
+        journal = self._journal(tmp_path)
+        journal.append(TranscriptEntry("user", "Hello", 1.5))
+        journal.close()
+        saved = journal.path.with_suffix(".json")
+        saved.write_text('{"messages": []}')
+        self._age(journal.path, 3600)
+        assert _recover_journals(tmp_path, min_age=600) == []
+        assert saved.read_text() == '{"messages": []}'
+        assert not journal.path.exists()
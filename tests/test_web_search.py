@@ -0,0 +1,141 @@
+"""Tests for pipeline/web_search.py — the search result cache and search_many."""
+
+import asyncio
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from pipeline import web_search
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Replace the ddgs call with a counter; returns the list of queries made."""
+    calls = []
+
+    def _search_sync(query, max_results):
+        calls.append(query)
+        if query == "nothing":
+            return []
+        return [{"title": f"{query} {len(calls)}", "url": "https://example.com", "snippet": "s"}]
+
+    monkeypatch.setattr(web_search, "_search_sync", _search_sync)
+    monkeypatch.setattr(web_search, "_CACHE", web_search.OrderedDict())
+    return calls
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(web_search.time, "monotonic", clock)
+    return clock
+
+
+class TestSearchCache:
+    async def test_repeat_query_is_cached(self, backend, clock):
+        first = await web_search.search("croma ac")
+        second = await web_search.search("croma ac")
+        assert backend == ["croma ac"]
+        assert first == second
+
+    async def test_entry_expires_after_ttl(self, backend, clock):
+        await web_search.search("croma ac")
+        clock.now += web_search._CACHE_TTL + 1
+        await web_search.search("croma ac")
+        assert backend == ["croma ac", "croma ac"]
+
+    async def test_empty_results_not_cached(self, backend, clock):
+        assert await web_search.search("nothing") == []
+        assert await web_search.search("nothing") == []
+        assert backend == ["nothing", "nothing"]
+
+    async def test_max_results_is_part_of_key(self, backend, clock):
+        await web_search.search("croma ac", max_results=5)
+        await web_search.search("croma ac", max_results=3)
+        assert len(backend) == 2
+
+    async def test_oldest_entry_evicted_beyond_max(self, backend, clock, monkeypatch):
+        monkeypatch.setattr(web_search, "_CACHE_MAX", 2)
+        await web_search.search("a")
+        await web_search.search("b")
+        await web_search.search("c")
+        assert list(web_search._CACHE) == [("b", 5), ("c", 5)]
+        await web_search.search("a")
+        assert backend == ["a", "b", "c", "a"]
+
+    async def test_returned_results_do_not_alias_cache(self, backend, clock):
+        first = await web_search.search("croma ac")
+        first[0]["title"] = "changed"
+        first.append({"title": "extra"})
+        second = await web_search.search("croma ac")
+        second[0]["snippet"] = "changed too"
+        third = await web_search.search("croma ac")
+        assert len(third) == 1
+        assert third[0]["title"] == "croma ac 1"
+        assert third[0]["snippet"] == "s"
+
+
+class TestSearchMany:
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        """Stub search(): results name their query, and peak concurrency is recorded."""
+        state = SimpleNamespace(active=0, peak=0)
+
+        async def search(query, max_results=5):
+            state.active += 1
+            state.peak = max(state.peak, state.active)
+            try:
+                # Later queries finish first, so order can't come from timing
+                await asyncio.sleep(0.01 / (1 + int(query[1:])))
+                if query == "q3":
+                    raise RuntimeError("rate limited")
+                return [{"title": query}]
+            finally:
+                state.active -= 1
+
+        monkeypatch.setattr(web_search, "search", search)
+        return state
+
+    async def test_results_in_query_order(self, stub):
+        queries = ["q0", "q1", "q2", "q4", "q5"]
+        results = await web_search.search_many(queries)
+        assert [r[0]["title"] for r in results] == queries
+
+    async def test_concurrency_bounded(self, stub):
+        await web_search.search_many([f"q{i}" for i in range(10) if i != 3], concurrency=3)
+        assert stub.peak == 3
+
+    async def test_failing_query_isolated(self, stub):
+        results = await web_search.search_many(["q1", "q3", "q2"])
+        assert results == [[{"title": "q1"}], [], [{"title": "q2"}]]
+
+    async def test_empty_batch(self, stub):
+        assert await web_search.search_many([]) == []
+
+
+class TestClientPool:
+    @pytest.fixture
+    def fresh_local(self, monkeypatch):
+        monkeypatch.setattr(web_search, "_local", threading.local())
+
+    def test_client_reused_within_thread(self, fresh_local):
+        first = web_search._client()
+        assert web_search._client() is first
+
+    async def test_each_thread_gets_its_own_client(self, fresh_local):
+        main = web_search._client()
+        other = await asyncio.to_thread(web_search._client)
+        assert other is not main